@@ -53,6 +53,9 @@ class Booking(models.Model):
 
     class Meta:
         db_table = "bookings"
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
         verbose_name_plural = "Bookings"
 
     def __str__(self):
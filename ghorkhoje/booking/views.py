@@ -8,12 +8,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import PageNumberPagination
 
 from booking.serilizers import *
+from utils.pagination import KeysetPaginationMixin
 from place.models import Place
 
 import traceback
 
 
-class StandardResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
@@ -96,7 +97,7 @@ class BookingRequestListAPIView(APIView):
                 .filter(place__owner=user)
                 .order_by("-created_at")
             )
-            if not bookings:
+            if not bookings.exists():
                 return JsonResponse(
                     {
                         "status": "failed",
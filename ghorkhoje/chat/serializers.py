@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from .models import Conversation, Message
 from user.serializers import UserProfileSerializer
+from utils.media import MediaModelSerializer
 
 
 class ConversationSerializer(serializers.ModelSerializer):
@@ -34,7 +35,7 @@ class ConversationSerializer(serializers.ModelSerializer):
         return ""
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(MediaModelSerializer):
     sender = serializers.SerializerMethodField()
 
     class Meta:
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "place",
     "user",
     "ghorkhoje",
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
     "feedback",
     "chat",
     "task",
+    "upload",
     "channels",
     "channels_postgres",
     "corsheaders",
@@ -113,6 +115,14 @@ CHANNEL_LAYERS = {
     },
 }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_CACHE_URL", "redis://redis:6379/1"),
+        "KEY_PREFIX": "ghorkhoje",
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -184,8 +194,38 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static_root")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
+# Optional CDN origin for media URLs, e.g. "https://cdn.example.com/media/"
+MEDIA_CDN_URL = os.environ.get("MEDIA_CDN_URL", "")
+
 
+# Partial chunked uploads are assembled here before being saved to storage
+CHUNKED_UPLOAD_ROOT = os.path.join(BASE_DIR, "uploads_tmp/")
 
 OTP_LENGTH = 4
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Celery Configuration Options
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/2")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/2")
+CELERY_TIMEZONE = "Asia/Dhaka"
+CELERY_TASK_TRACK_STARTED = True
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_SERIALIZER = "json"
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-featured-places": {
+        "task": "place.tasks.refresh_featured_places",
+        "schedule": timedelta(minutes=10),
+    },
+    "cleanup-expired-uploads": {
+        "task": "upload.tasks.cleanup_expired_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "refresh-area-rent-stats": {
+        "task": "place.tasks.refresh_area_rent_stats",
+        "schedule": timedelta(hours=1),
+    },
+}
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "cloudinary_storage",
     "cloudinary",
     "place",
@@ -49,6 +50,7 @@ INSTALLED_APPS = [
     "feedback",
     "chat",
     "task",
+    "upload",
     "channels",
     "channels_postgres",
     "corsheaders",
@@ -143,6 +145,14 @@ else:
         },
     }
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_CACHE_URL", "redis://redis:6379/1"),
+        "KEY_PREFIX": "ghorkhoje",
+    }
+}
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.postgresql",
@@ -235,11 +245,20 @@ if os.environ.get("ENVIRONMENT") == "production":
 
     MEDIA_URL = "/ghorkhojee/media/"
     DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
+    # Media URLs are built from this base and the stored name, without the SDK
+    MEDIA_CDN_URL = os.environ.get(
+        "MEDIA_CDN_URL",
+        f"https://res.cloudinary.com/{CLOUDINARY_STORAGE['CLOUD_NAME']}/image/upload/",
+    )
 else:
     # In Development use Local Storage
     MEDIA_URL = "/media/"
     MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
+    MEDIA_CDN_URL = os.environ.get("MEDIA_CDN_URL", "")
+
 
+# Partial chunked uploads are assembled here before being saved to storage
+CHUNKED_UPLOAD_ROOT = os.path.join(BASE_DIR, "uploads_tmp/")
 
 OTP_LENGTH = 4
 
@@ -247,13 +266,28 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 # Celery Configuration Options
-# CELERY_BROKER_URL = "redis://redis:6379"
-# CELERY_RESULT_BACKEND = "redis://redis:6379"
-# CELERY_TIMEZONE = "Asia/Dhaka"
-# CELERY_TASK_TRACK_STARTED = True
-# CELERY_ACCEPT_CONTENT = ["json"]
-# CELERY_TASK_SERIALIZER = "json"
-# CELERY_RESULT_SERIALIZER = "json"
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://redis:6379/2")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", "redis://redis:6379/2")
+CELERY_TIMEZONE = "Asia/Dhaka"
+CELERY_TASK_TRACK_STARTED = True
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_SERIALIZER = "json"
+
+CELERY_BEAT_SCHEDULE = {
+    "refresh-featured-places": {
+        "task": "place.tasks.refresh_featured_places",
+        "schedule": timedelta(minutes=10),
+    },
+    "cleanup-expired-uploads": {
+        "task": "upload.tasks.cleanup_expired_uploads",
+        "schedule": timedelta(hours=1),
+    },
+    "refresh-area-rent-stats": {
+        "task": "place.tasks.refresh_area_rent_stats",
+        "schedule": timedelta(hours=1),
+    },
+}
 
 # # For periodic tasks
 # CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
@@ -9,6 +9,7 @@ from place.urls import place_urlpatterns
 from booking.urls import booking_urlpatterns
 from feedback.urls import feedback_urlpatterns
 from chat.urls import chat_urlpatterns
+from upload.urls import upload_urlpatterns
 
 api_v1_urls = [
     path("auth/", include(auth_urlpatterns), name="auth_urls"),
@@ -18,11 +19,13 @@ api_v1_urls = [
     path("bookings/", include(booking_urlpatterns), name="booking_urls"),
     path("feedback/", include(feedback_urlpatterns), name="feedback_urls"),
     path("chat/", include(chat_urlpatterns), name="chat_urls"),
+    path("uploads/", include(upload_urlpatterns), name="upload_urls"),
     path(
         "generals/reviews/",
         GeneralReviews.as_view(),
         name="general_reviews",
     ),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache_stats"),
 ]
 
 urlpatterns = [
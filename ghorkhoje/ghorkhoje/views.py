@@ -2,12 +2,13 @@ from django.http import HttpResponse
 from django.views.decorators.http import require_GET
 
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 
 from user.models import Review
 from ghorkhoje.serializers import ReviewSerializer
+from utils.cache import response_cache_stats
 
 
 class HealthView(APIView):
@@ -17,6 +18,20 @@ class HealthView(APIView):
         return Response({"message": "Okay"}, status=status.HTTP_200_OK)
 
 
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "status": "success",
+                "message": "Cache stats fetched successfully.",
+                "data": response_cache_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class GeneralReviews(APIView):
     permission_classes = [AllowAny]
 
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from place.configs import PlaceRating
 from place.models import *
 
 
@@ -16,7 +17,15 @@ class PlaceAdmin(admin.ModelAdmin):
     search_fields = ("title", "owner__username", "city")
     search_help_text = "Search by title, owner's username or city"
     ordering = ("-created_at",)
-    readonly_fields = ("created_at", "updated_at", "slug")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "slug",
+        "bookmark_count",
+        "review_count",
+        *[f"{field}_rating_sum" for field in PlaceRating.FIELDS],
+        *[f"{field}_rating_avg" for field in PlaceRating.FIELDS],
+    )
 
 
 @admin.register(Category)
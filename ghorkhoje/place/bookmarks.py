@@ -0,0 +1,144 @@
+import traceback
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from place.configs import Bookmarks
+from place.models import Bookmark, Place
+
+BookmarkResult = namedtuple(
+    "BookmarkResult", "place_id own_place changed bookmarked bookmark_count"
+)
+
+# One statement per bookmark write: the delete, the insert and the counter
+# update only see each other's RETURNING rows, so concurrent requests can
+# neither add a place twice nor count a change that did not happen
+BOOKMARK_SQL = """
+WITH place AS (
+    SELECT id, owner_id = %(user_id)s AS own, bookmark_count
+    FROM {places} WHERE slug = %(slug)s
+), removed AS (
+    DELETE FROM {through} AS saved
+    USING {bookmarks} AS bookmark, place
+    WHERE %(remove)s
+        AND saved.bookmark_id = bookmark.id
+        AND bookmark.user_id = %(user_id)s
+        AND saved.place_id = place.id
+    RETURNING saved.place_id
+), bookmark AS (
+    INSERT INTO {bookmarks} (user_id, created_at, updated_at)
+    SELECT %(user_id)s, now(), now() FROM place
+    WHERE %(add)s AND NOT place.own AND NOT EXISTS (SELECT 1 FROM removed)
+    ON CONFLICT (user_id) DO UPDATE SET updated_at = EXCLUDED.updated_at
+    RETURNING id
+), added AS (
+    INSERT INTO {through} (bookmark_id, place_id)
+    SELECT bookmark.id, place.id FROM bookmark, place
+    ON CONFLICT (bookmark_id, place_id) DO NOTHING
+    RETURNING place_id
+), counted AS (
+    UPDATE {places}
+    SET bookmark_count = bookmark_count
+        + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed)
+    WHERE id IN (SELECT place_id FROM added UNION ALL SELECT place_id FROM removed)
+    RETURNING bookmark_count
+)
+SELECT
+    place.id,
+    place.own,
+    EXISTS (SELECT 1 FROM added) OR EXISTS (SELECT 1 FROM removed),
+    EXISTS (SELECT 1 FROM removed),
+    COALESCE((SELECT bookmark_count FROM counted), place.bookmark_count)
+FROM place
+"""
+
+
+def _ids_cache_key(user_id):
+    return f"{Bookmarks.IDS_CACHE_PREFIX}:{user_id}"
+
+
+def bookmarked_place_ids(user_id):
+    """
+    Ids of the places a user bookmarked, as a frozenset. Kept in the cache
+    so membership checks cost one round trip; loaded from the database on
+    a miss or a cache outage.
+    """
+    key = _ids_cache_key(user_id)
+    try:
+        ids = cache.get(key)
+    except Exception:
+        traceback.print_exc()
+        ids = None
+    if ids is not None:
+        return ids
+
+    ids = frozenset(
+        Bookmark.places.through.objects.filter(bookmark__user_id=user_id).values_list(
+            "place_id", flat=True
+        )
+    )
+    try:
+        cache.set(key, ids, Bookmarks.IDS_CACHE_TTL)
+    except Exception:
+        traceback.print_exc()
+    return ids
+
+
+def request_bookmarked_place_ids(request):
+    """bookmarked_place_ids of the request's user, empty for anonymous users."""
+    if request is None or not request.user.is_authenticated:
+        return frozenset()
+    # Memoized on the request: one cache lookup per response, not per card
+    ids = getattr(request, "_bookmarked_place_ids", None)
+    if ids is None:
+        ids = bookmarked_place_ids(request.user.pk)
+        request._bookmarked_place_ids = ids
+    return ids
+
+
+def invalidate_bookmarked_place_ids(*user_ids):
+    """Drop the cached ids of the given users once the transaction commits."""
+
+    def delete():
+        try:
+            cache.delete_many([_ids_cache_key(user_id) for user_id in user_ids])
+        except Exception:
+            traceback.print_exc()
+
+    if user_ids:
+        transaction.on_commit(delete)
+
+
+def bookmark_place(user_id, slug, action):
+    """
+    Add ("add"), remove ("remove") or flip ("toggle") a user's bookmark of
+    the place with `slug` in a single statement, keeping the place's
+    bookmark_count in step. Returns a BookmarkResult, or None when there is
+    no such place. Owners cannot bookmark their own places.
+    """
+    sql = BOOKMARK_SQL.format(
+        places=connection.ops.quote_name(Place._meta.db_table),
+        bookmarks=connection.ops.quote_name(Bookmark._meta.db_table),
+        through=connection.ops.quote_name(Bookmark.places.through._meta.db_table),
+    )
+    params = {
+        "user_id": user_id,
+        "slug": slug,
+        "add": action in ("add", "toggle"),
+        "remove": action in ("remove", "toggle"),
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    place_id, own_place, changed, removed, bookmark_count = row
+    if changed:
+        invalidate_bookmarked_place_ids(user_id)
+    if action == "toggle":
+        bookmarked = not removed and not own_place
+    else:
+        bookmarked = action == "add" and not own_place
+    return BookmarkResult(place_id, own_place, changed, bookmarked, bookmark_count)
@@ -0,0 +1,69 @@
+import hashlib
+import traceback
+
+from place.configs import CacheGeneration
+from place.models import Place
+from utils.cache import get_generations
+
+
+def _representation(request):
+    # Serializers build absolute URLs and the browsable API renders HTML
+    return [request.build_absolute_uri("/"), request.accepted_renderer.format]
+
+
+def _make_etag(*parts):
+    return hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _generations(*names):
+    try:
+        return get_generations(*names)
+    except Exception:
+        # Without the counters there is nothing safe to validate against
+        traceback.print_exc()
+        return None
+
+
+def _place_detail_version(slug):
+    return (
+        Place.objects.filter(slug=slug)
+        .values(
+            "updated_at",
+            # User.created_at is auto_now, so it moves on every profile save
+            "owner__created_at",
+            "owner__host_stats__updated_at",
+        )
+        .first()
+    )
+
+
+def place_detail_etag(request, slug):
+    """
+    Place.updated_at advances on image, facility and review changes, and
+    HostStats.updated_at on host review changes. Category and facility
+    renames and rent stats refreshes are covered by their generation counters.
+    No Last-Modified is sent, since the counters have no timestamp.
+    """
+    version = _place_detail_version(slug)
+    generations = _generations(
+        CacheGeneration.CATEGORIES,
+        CacheGeneration.FACILITIES,
+        CacheGeneration.RENT_STATS,
+    )
+    if version is None or generations is None:
+        return None
+    return _make_etag(*version.values(), *generations, *_representation(request))
+
+
+def category_list_etag(request):
+    generations = _generations(CacheGeneration.CATEGORIES)
+    if generations is None:
+        return None
+    return _make_etag("categories", *generations, *_representation(request))
+
+
+def facility_list_etag(request):
+    generations = _generations(CacheGeneration.FACILITIES)
+    if generations is None:
+        return None
+    return _make_etag("facilities", *generations, *_representation(request))
@@ -14,3 +14,112 @@ class AppointmentStatus:
         (APPOINTMENT_CANCELLED, "Appointment Cancelled"),
         (APPOINTMENT_COMPLETED, "Appointment Completed"),
     ]
+
+
+class PlaceRating:
+    OVERALL = "overall"
+    CLEANLINESS = "cleanliness"
+    DESCRIPTION_MATCH = "description_match"
+    LOCATION_CONVENIENCE = "location_convenience"
+    VALUE_FOR_MONEY = "value_for_money"
+    NEIGHBORHOOD = "neighborhood"
+
+    FIELDS = [
+        OVERALL,
+        CLEANLINESS,
+        DESCRIPTION_MATCH,
+        LOCATION_CONVENIENCE,
+        VALUE_FOR_MONEY,
+        NEIGHBORHOOD,
+    ]
+
+
+class ReviewListing:
+    # Latest reviews embedded in place and host payloads, the rest are paged
+    LATEST_COUNT = 5
+    DEFAULT_SORT = "recent"
+    SORT_OPTIONS = {
+        "recent": "-created_at",
+        "oldest": "created_at",
+        "highest": "-overall",
+        "lowest": "overall",
+    }
+
+
+class PlaceFacets:
+    CACHE_PREFIX = "place_facets"
+    CACHE_TTL = 60  # seconds
+
+    # Bedroom counts at or above the last value are grouped together
+    BEDROOMS = [1, 2, 3, 4, 5]
+
+    # (min, max) monthly rent, max exclusive; None means unbounded
+    RENT_BUCKETS = [
+        (0, 5000),
+        (5000, 10000),
+        (10000, 20000),
+        (20000, 40000),
+        (40000, None),
+    ]
+
+
+class CacheGeneration:
+    # Generation counters bumped when the matching rows change
+    PLACES = "places"
+    CATEGORIES = "categories"
+    FACILITIES = "facilities"
+    RENT_STATS = "rent_stats"
+
+
+class FeaturedPlaces:
+    SNAPSHOT_KEY = "featured_places_snapshot"
+    ROTATION_INTERVAL = 300  # seconds each rotation step is shown for
+    MAX_LIMIT = 50
+
+
+class ImageVariants:
+    # Target widths in pixels; smaller originals are never upscaled
+    WIDTHS = {
+        "card": 480,
+        "gallery": 1024,
+        "full": 1920,
+    }
+    FORMATS = {
+        "webp": ("WEBP", "webp"),
+        "jpeg": ("JPEG", "jpg"),
+    }
+    QUALITY = 80
+    # Re-encoding originals to drop their metadata
+    ORIGINAL_QUALITY = 95
+    UPLOAD_DIR = "places/variants"
+
+
+class SimilarPlaces:
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+    # Relative importance of each feature group in the weighted distance
+    WEIGHTS = {
+        "rent": 3.0,
+        "bedrooms": 2.0,
+        "bathrooms": 1.0,
+        "area": 1.0,
+        "location": 2.0,
+        "category": 1.5,
+        "facility": 0.5,  # per facility one place has and the other lacks
+    }
+    # Seconds between checks for changed places, and between full rebuilds
+    # that refresh the scaling and drop deleted places
+    SYNC_INTERVAL = 30
+    REBUILD_INTERVAL = 60 * 60
+    # Re-read rows updated this long before the last sync, for transactions
+    # that committed after it
+    SYNC_OVERLAP = 60
+    # Extra neighbours fetched to cover places deleted since the last rebuild
+    CANDIDATE_MARGIN = 5
+
+
+class Bookmarks:
+    IDS_CACHE_PREFIX = "bookmarked_place_ids"
+    # Writes drop the cached ids; the TTL bounds how long ids of deleted
+    # places, removed without signals by the cascade, can linger
+    IDS_CACHE_TTL = 60 * 60 * 24
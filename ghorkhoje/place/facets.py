@@ -0,0 +1,102 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import Count, Exists, OuterRef, Q
+
+from place.configs import CacheGeneration, PlaceFacets
+from place.filters import normalize_filter_params
+from place.models import Category, Facility, Place
+from utils.cache import get_generations
+
+
+def facets_cache_key(params):
+    digest = hashlib.md5(
+        urlencode(normalize_filter_params(params)).encode()
+    ).hexdigest()
+    version = ".".join(
+        str(generation)
+        for generation in get_generations(
+            CacheGeneration.PLACES,
+            CacheGeneration.CATEGORIES,
+            CacheGeneration.FACILITIES,
+        )
+    )
+    return f"{PlaceFacets.CACHE_PREFIX}:{version}:{digest}"
+
+
+def _bedroom_filter(value):
+    if value == PlaceFacets.BEDROOMS[-1]:
+        return Q(num_of_bedrooms__gte=value)
+    return Q(num_of_bedrooms=value)
+
+
+def _rent_filter(min_rent, max_rent):
+    condition = Q(rent_per_month__gte=min_rent)
+    if max_rent is not None:
+        condition &= Q(rent_per_month__lt=max_rent)
+    return condition
+
+
+def facet_counts(places):
+    """
+    Count the filtered places per category, facility, bedroom count and
+    rent bucket. All counts come from a single aggregate over `places`
+    using conditional aggregation; facilities are matched with EXISTS so
+    the join does not multiply rows.
+    """
+    categories = list(Category.objects.order_by("name").values("id", "slug", "name"))
+    facilities = list(Facility.objects.order_by("name").values("id", "slug", "name"))
+    through = Place.facilities.through
+
+    aggregates = {"total": Count("id")}
+    for category in categories:
+        aggregates[f"category_{category['id']}"] = Count(
+            "id", filter=Q(category_id=category["id"])
+        )
+    for facility in facilities:
+        aggregates[f"facility_{facility['id']}"] = Count(
+            "id",
+            filter=Q(
+                Exists(
+                    through.objects.filter(
+                        place_id=OuterRef("pk"), facility_id=facility["id"]
+                    )
+                )
+            ),
+        )
+    for value in PlaceFacets.BEDROOMS:
+        aggregates[f"bedrooms_{value}"] = Count("id", filter=_bedroom_filter(value))
+    for index, (min_rent, max_rent) in enumerate(PlaceFacets.RENT_BUCKETS):
+        aggregates[f"rent_{index}"] = Count(
+            "id", filter=_rent_filter(min_rent, max_rent)
+        )
+
+    counts = places.order_by().aggregate(**aggregates)
+
+    last_bedroom = PlaceFacets.BEDROOMS[-1]
+    return {
+        "total": counts["total"],
+        "categories": [
+            {**category, "count": counts[f"category_{category['id']}"]}
+            for category in categories
+        ],
+        "facilities": [
+            {**facility, "count": counts[f"facility_{facility['id']}"]}
+            for facility in facilities
+        ],
+        "bedrooms": [
+            {
+                "value": f"{value}+" if value == last_bedroom else str(value),
+                "count": counts[f"bedrooms_{value}"],
+            }
+            for value in PlaceFacets.BEDROOMS
+        ],
+        "rent": [
+            {
+                "min": min_rent,
+                "max": max_rent,
+                "count": counts[f"rent_{index}"],
+            }
+            for index, (min_rent, max_rent) in enumerate(PlaceFacets.RENT_BUCKETS)
+        ],
+    }
@@ -0,0 +1,54 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from place.configs import FeaturedPlaces
+from place.models import Image, Place
+from place.serializer import PlaceListSerializer
+
+
+def build_featured_snapshot():
+    """
+    Serialize the featured place cards and store them in the cache.
+    Cards hold relative image URLs (unless MEDIA_CDN_URL is set), made
+    absolute when served.
+    """
+    places = (
+        Place.objects.select_related("owner")
+        .prefetch_related(
+            Prefetch(
+                "images",
+                queryset=Image.objects.only("id", "place", "image", "variants")[:1],
+                to_attr="first_image",
+            ),
+        )
+        .filter(featured=True, is_available=True)
+        .order_by("-created_at")
+    )
+    snapshot = {
+        "generated_at": timezone.now().isoformat(),
+        "places": PlaceListSerializer(places, many=True).data,
+    }
+    cache.set(FeaturedPlaces.SNAPSHOT_KEY, snapshot, timeout=None)
+    return snapshot
+
+
+def get_featured_snapshot():
+    snapshot = cache.get(FeaturedPlaces.SNAPSHOT_KEY)
+    if snapshot is None:
+        # Cold cache, e.g. right after a deploy or a Redis flush
+        snapshot = build_featured_snapshot()
+    return snapshot
+
+
+def rotate(places, offset):
+    if not places:
+        return places
+    offset %= len(places)
+    return places[offset:] + places[:offset]
+
+
+def current_rotation():
+    return int(time.time() // FeaturedPlaces.ROTATION_INTERVAL)
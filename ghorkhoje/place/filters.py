@@ -0,0 +1,235 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import Exists, F, FloatField, OuterRef, Q
+from django.db.models.functions import Cast
+from django.utils.timezone import now, timedelta
+
+from place.models import Category, Facility, Place
+
+# Query params understood by filter_places, used to normalize cache keys
+FILTER_PARAMS = [
+    "category",
+    "search",
+    "date_range",
+    "min_rent",
+    "max_rent",
+    "bedrooms",
+    "bathrooms",
+    "city",
+    "area_name",
+    "facilities",
+    "available_from",
+    "parking",
+    "capacity",
+]
+
+TRUE_VALUES = ("true", "1", "yes")
+
+
+def _decimal_param(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"'{name}' must be a number.")
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a whole number.")
+
+
+def _room_count_param(params, name):
+    """
+    Parse a room count such as `2` (exactly two) or `5+` (five or more).
+    Returns a lookup dict for the given field, or None when not set.
+    """
+    value = params.get(name, "").strip()
+    if not value:
+        return None
+    at_least = value.endswith("+")
+    try:
+        count = int(value.rstrip("+"))
+    except ValueError:
+        raise ValueError(
+            f"'{name}' must be a whole number, optionally followed by '+'."
+        )
+    return count, at_least
+
+
+def _date_param(params, name):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format.")
+
+
+def _list_param(params, name):
+    values = params.getlist(name) if hasattr(params, "getlist") else [params.get(name)]
+    items = []
+    for value in values:
+        if value:
+            items += [item.strip() for item in value.split(",") if item.strip()]
+    return items
+
+
+def _search_query(search_query):
+    return SearchQuery(search_query, config="english", search_type="websearch")
+
+
+def rank_by_relevance(places, params):
+    """
+    Order places by how well they match the `search` param. Without a
+    search term there is nothing to rank, so the queryset is returned as is.
+    """
+    search_query = params.get("search", "").strip().lower()
+    if not search_query:
+        return places
+
+    # Both scores are real (float4); as double precision the value read
+    # back into a keyset cursor compares equal to the row's own
+    return places.annotate(
+        relevance=Cast(
+            SearchRank(F("search_vector"), _search_query(search_query))
+            + TrigramWordSimilarity(search_query, "title"),
+            FloatField(),
+        )
+    ).order_by("-relevance", "-created_at")
+
+
+def filter_places(places, params):
+    """
+    Apply the public listing filters shared by the place list endpoints.
+    `params` is the request's query params.
+    """
+    # Stripped like normalize_filter_params, which builds the cache keys
+    category_slug = params.get("category", "").strip() or "all"
+    search_query = params.get("search", "").strip().lower()
+    date_range = params.get(
+        "date_range", ""
+    ).strip()  # 'last_7_days', 'last_30_days', 'all'
+    min_rent = _decimal_param(params, "min_rent")
+    max_rent = _decimal_param(params, "max_rent")
+    bedrooms = _room_count_param(params, "bedrooms")  # '2' or '5+'
+    bathrooms = _room_count_param(params, "bathrooms")
+    city = params.get("city", "").strip()
+    area_name = params.get("area_name", "").strip()
+    facility_slugs = _list_param(params, "facilities")  # 'wifi,lift' or repeated
+    available_from = _date_param(params, "available_from")
+    parking = params.get("parking", "").strip().lower() in TRUE_VALUES
+    capacity = _int_param(params, "capacity")
+
+    # Filter: Category
+    if category_slug != "all":
+        category = Category.objects.filter(slug=category_slug).first()
+        if category:
+            places = places.filter(category=category)
+
+    # Filter: Search. Full-text on the stored vector, substrings of the
+    # title and description, and trigram word similarity for typos, which
+    # compares the query with the closest part of the title rather than
+    # the whole of it. All of them use an index.
+    if search_query:
+        places = places.filter(
+            Q(search_vector=_search_query(search_query))
+            | Q(title__icontains=search_query)
+            | Q(description__icontains=search_query)
+            | Q(title__trigram_word_similar=search_query)
+        )
+
+    # Filter: Date Range
+    if date_range == "last_7_days":
+        places = places.filter(created_at__gte=now() - timedelta(days=7))
+    elif date_range == "last_30_days":
+        places = places.filter(created_at__gte=now() - timedelta(days=30))
+    # else 'all' means no filter
+
+    # Filter: Price
+    if min_rent is not None:
+        places = places.filter(rent_per_month__gte=min_rent)
+    if max_rent is not None:
+        places = places.filter(rent_per_month__lte=max_rent)
+
+    # Filter: Location (exact matches so the city/area indexes apply)
+    if city:
+        places = places.filter(city=city)
+    if area_name:
+        places = places.filter(area_name=area_name)
+
+    # Filter: Rooms
+    for field, value in (
+        ("num_of_bedrooms", bedrooms),
+        ("num_of_bathrooms", bathrooms),
+    ):
+        if value is not None:
+            count, at_least = value
+            lookup = f"{field}__gte" if at_least else field
+            places = places.filter(**{lookup: count})
+
+    # Filter: Capacity & Parking
+    if capacity is not None:
+        places = places.filter(capacity__gte=capacity)
+    if parking:
+        places = places.filter(num_of_parking_spaces__gt=0)
+
+    # Filter: Availability (no date set means available now)
+    if available_from is not None:
+        places = places.filter(
+            Q(available_from__isnull=True) | Q(available_from__lte=available_from)
+        )
+
+    # Filter: Facilities (place must have all of them)
+    if facility_slugs:
+        facility_ids = list(
+            Facility.objects.filter(slug__in=facility_slugs).values_list(
+                "id", flat=True
+            )
+        )
+        if len(facility_ids) < len(set(facility_slugs)):
+            return places.none()
+        through = Place.facilities.through
+        for facility_id in facility_ids:
+            places = places.filter(
+                Exists(
+                    through.objects.filter(
+                        place_id=OuterRef("pk"), facility_id=facility_id
+                    )
+                )
+            )
+
+    return places
+
+
+def normalize_filter_params(params):
+    """
+    Reduce query params to the filters that change the result of
+    filter_places, in a stable order, so equal filter sets share a key.
+    """
+    normalized = []
+    for name in FILTER_PARAMS:
+        if name == "facilities":
+            value = ",".join(sorted(set(_list_param(params, name))))
+        else:
+            value = str(params.get(name) or "").strip()
+        if name == "search":
+            value = value.lower()
+        if not value or (name == "category" and value == "all"):
+            continue
+        normalized.append((name, value))
+    return normalized
@@ -0,0 +1,120 @@
+from math import cos, degrees, radians
+
+from django.db.models import F, FloatField
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return (min_lat, max_lat, min_lng, max_lng) of a box that contains every
+    point within `radius_km` of the given coordinate.
+    """
+    lat_delta = degrees(radius_km / EARTH_RADIUS_KM)
+    if latitude - lat_delta <= -90 or latitude + lat_delta >= 90:
+        # The circle reaches a pole, where every longitude is within range
+        # (and cos(latitude) would be 0 at the pole itself)
+        return max(latitude - lat_delta, -90), min(latitude + lat_delta, 90), -180, 180
+    lng_delta = degrees(radius_km / (EARTH_RADIUS_KM * cos(radians(latitude))))
+    return (
+        latitude - lat_delta,
+        latitude + lat_delta,
+        longitude - lng_delta,
+        longitude + lng_delta,
+    )
+
+
+def haversine_distance(latitude, longitude):
+    """
+    Database expression for the great-circle distance in km between the
+    row's latitude/longitude and the given coordinate.
+    """
+    row_lat = Radians(Cast(F("latitude"), FloatField()))
+    row_lng = Radians(Cast(F("longitude"), FloatField()))
+    origin_lat = radians(latitude)
+    origin_lng = radians(longitude)
+
+    half_dlat = Sin((row_lat - origin_lat) / 2)
+    half_dlng = Sin((row_lng - origin_lng) / 2)
+    a = Power(half_dlat, 2) + cos(origin_lat) * Cos(row_lat) * Power(half_dlng, 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_MAX_PRECISION = 12
+
+# Map zoom level -> geohash length used to group markers into cells
+GEOHASH_PRECISION_BY_ZOOM = [
+    (3, 1),
+    (5, 2),
+    (7, 3),
+    (9, 4),
+    (12, 5),
+    (14, 6),
+    (16, 7),
+]
+
+
+# Most geohash cells a cluster request may cover, whatever its zoom
+MAX_CLUSTER_CELLS = 1024
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_MAX_PRECISION):
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True  # geohash interleaves bits starting with longitude
+    while len(geohash) < precision:
+        value, value_range = (
+            (longitude, lng_range) if even_bit else (latitude, lat_range)
+        )
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even_bit = not even_bit
+
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def geohash_precision_for_zoom(zoom):
+    for max_zoom, precision in GEOHASH_PRECISION_BY_ZOOM:
+        if zoom < max_zoom:
+            return precision
+    return 8
+
+
+def geohash_cell_size(precision):
+    """(latitude, longitude) size in degrees of a geohash cell."""
+    bits = precision * 5
+    # Longitude takes the odd bit when the count is odd
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def clamp_geohash_precision(precision, lat_span, lng_span, max_cells=MAX_CLUSTER_CELLS):
+    """
+    Lower `precision` until the cells covering a box of the given spans
+    (in degrees) fit in `max_cells`, so wide boxes at high zoom cannot
+    return one cluster per place.
+    """
+    while precision > 1:
+        lat_size, lng_size = geohash_cell_size(precision)
+        cells = (lat_span / lat_size + 1) * (lng_span / lng_size + 1)
+        if cells <= max_cells:
+            break
+        precision -= 1
+    return precision
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import uuid
+from io import BytesIO
+
+from PIL import Image as PillowImage, ImageOps
+
+from django.core.files.base import ContentFile
+
+from place.configs import ImageVariants
+
+ORIENTATION_TAG = 0x0112
+
+
+def _encode(picture, pillow_format):
+    buffer = BytesIO()
+    options = {"quality": ImageVariants.QUALITY}
+    if pillow_format == "JPEG":
+        options.update(optimize=True, progressive=True)
+    # No exif is passed, so the variants carry no EXIF metadata (GPS etc.)
+    picture.save(buffer, format=pillow_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def flatten(picture):
+    """RGB copy of `picture` with transparent areas laid over white."""
+    if picture.mode in ("RGBA", "LA", "PA") or (
+        picture.mode == "P" and "transparency" in picture.info
+    ):
+        picture = picture.convert("RGBA")
+        background = PillowImage.new("RGB", picture.size, "white")
+        background.paste(picture, mask=picture.getchannel("A"))
+        return background
+    return picture.convert("RGB")
+
+
+def strip_metadata(upload):
+    """
+    Re-encode an uploaded image without its EXIF and XMP metadata (camera,
+    GPS position etc.), applying the EXIF orientation first. Returns a
+    ContentFile with the upload's name, as the stored original is served.
+    """
+    upload.seek(0)
+    picture = PillowImage.open(upload)
+    pillow_format = picture.format
+    options = {"icc_profile": picture.info.get("icc_profile")}
+    if getattr(picture, "n_frames", 1) > 1:
+        options["save_all"] = True
+    elif picture.getexif().get(ORIENTATION_TAG, 1) != 1:
+        picture = ImageOps.exif_transpose(picture)
+        options["quality"] = ImageVariants.ORIGINAL_QUALITY
+    elif pillow_format == "JPEG":
+        # Unrotated JPEGs keep their quantization, so quality barely changes
+        options.update(quality="keep", subsampling="keep")
+    else:
+        options["quality"] = ImageVariants.ORIGINAL_QUALITY
+
+    buffer = BytesIO()
+    # Pillow only writes the metadata passed to save()
+    picture.save(buffer, format=pillow_format, **options)
+    upload.seek(0)
+    return ContentFile(buffer.getvalue(), name=os.path.basename(upload.name))
+
+
+def perceptual_hash(picture):
+    """
+    64 bit difference hash (dHash) as 16 hex digits. Re-encoded, resized
+    or slightly edited copies of a photo end up a few bits apart.
+    """
+    small = picture.convert("L").resize((9, 8), PillowImage.LANCZOS)
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = bits << 1 | (left > right)
+    return f"{bits:016x}"
+
+
+def content_hashes(upload):
+    """
+    Return (sha256, perceptual hash) of an uploaded image file, leaving it
+    rewound for saving. Raises if the file is not a readable image.
+    """
+    digest = hashlib.sha256()
+    upload.seek(0)
+    for piece in upload.chunks():
+        digest.update(piece)
+
+    upload.seek(0)
+    picture = PillowImage.open(upload)
+    # JPEGs decode at a fraction of their size, the hash only needs 9x8
+    picture.draft("L", (64, 64))
+    phash = perceptual_hash(ImageOps.exif_transpose(picture))
+    upload.seek(0)
+    return digest.hexdigest(), phash
+
+
+def generate_variants(image):
+    """
+    Render every configured width of `image` (a place Image) as WebP and
+    JPEG and save them to the image's storage. Returns the variants map
+    stored on Image.variants:
+    {"card": {"width": 480, "webp": "<name>", "jpeg": "<name>"}, ...}
+    """
+    field = image.image
+    storage = field.storage
+    # Unique per rendering: images without a blob can share one file name
+    prefix = uuid.uuid4().hex
+
+    with field.open("rb") as source:
+        original = PillowImage.open(source)
+        # Apply the EXIF orientation before the metadata is dropped
+        original = ImageOps.exif_transpose(original)
+        original = flatten(original)
+
+    variants = {}
+    for name, width in ImageVariants.WIDTHS.items():
+        picture = original
+        if original.width > width:
+            height = round(original.height * width / original.width)
+            picture = original.resize((width, height), PillowImage.LANCZOS)
+
+        variant = {"width": picture.width}
+        for key, (pillow_format, extension) in ImageVariants.FORMATS.items():
+            path = f"{ImageVariants.UPLOAD_DIR}/{prefix}_{name}.{extension}"
+            variant[key] = storage.save(path, _encode(picture, pillow_format))
+        variants[name] = variant
+    return variants
+
+
+def delete_variants(variants, storage):
+    for variant in variants.values():
+        for key in ImageVariants.FORMATS:
+            if variant.get(key):
+                storage.delete(variant[key])
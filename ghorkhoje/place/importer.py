@@ -0,0 +1,270 @@
+import codecs
+import csv
+import json
+import os
+from collections import Counter
+from urllib.parse import urlparse
+
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from place.configs import CacheGeneration
+from place.geo import encode_geohash
+from place.models import Category, Facility, Image, ImageBlob, Place
+from place.serializer import PlaceSerializer
+from user.models import HostStats
+from utils.cache import bump_generation
+from utils.functions import allocate_unique_slugs
+from utils.media import ABSOLUTE_PREFIXES
+
+IMPORT_CHUNK_SIZE = 500
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "webp")
+
+
+def read_rows(stream, file_format):
+    """
+    Yield (row_number, row) pairs from a binary CSV or JSONL stream
+    without reading the whole file into memory. Unparsable rows are
+    yielded as exceptions so they can be reported.
+    """
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    if file_format == "csv":
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            yield number, row
+    elif file_format == "jsonl":
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, e
+                continue
+            if not isinstance(row, dict):
+                yield number, ValueError("Each line must be a JSON object.")
+                continue
+            yield number, row
+    else:
+        raise ValueError("Unsupported format, use 'csv' or 'jsonl'.")
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    return "jsonl" if extension in ("jsonl", "ndjson") else extension
+
+
+def _split(value):
+    if isinstance(value, list):
+        return value
+    return [item.strip() for item in str(value or "").split(",") if item.strip()]
+
+
+class PlaceImporter:
+    """
+    Validate rows with PlaceSerializer and Place.clean, then insert valid
+    rows in chunks with bulk_create. Invalid rows are reported, not fatal.
+
+    Rows use PlaceSerializer fields. `category` and `facilities` accept ids
+    or slugs (facilities comma separated), and `images` lists image URLs
+    or storage names of the owner's existing place images, comma separated
+    or as JSON objects with `image` and `description`. Images reusing a
+    stored file share its blob.
+    """
+
+    def __init__(self, owner, chunk_size=IMPORT_CHUNK_SIZE):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.created = 0
+        self.errors = []
+
+        # Resolve references in memory instead of one query per row
+        self.categories = {}
+        for category_id, slug in Category.objects.values_list("id", "slug"):
+            self.categories[str(category_id)] = category_id
+            if slug:
+                self.categories[slug] = category_id
+        self.facilities = {}
+        for facility_id, slug in Facility.objects.values_list("id", "slug"):
+            self.facilities[str(facility_id)] = facility_id
+            if slug:
+                self.facilities[slug] = facility_id
+        # Storage name -> (blob id, variants) of the owner's place images
+        self.own_files = None
+        self.existing_files = {}
+
+    def run(self, rows):
+        chunk = []
+        for number, row in rows:
+            if isinstance(row, Exception):
+                self.errors.append({"row": number, "errors": str(row)})
+                continue
+            prepared = self.prepare(number, row)
+            if prepared is not None:
+                chunk.append(prepared)
+            if len(chunk) >= self.chunk_size:
+                self.insert(chunk)
+                chunk = []
+        if chunk:
+            self.insert(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def prepare(self, number, row):
+        row = {key: value for key, value in row.items() if value not in (None, "")}
+        errors = {}
+
+        category = row.pop("category", None)
+        category_id = None
+        if category is not None:
+            category_id = self.categories.get(str(category))
+            if category_id is None:
+                errors["category"] = [f"Unknown category '{category}'."]
+
+        facility_ids = []
+        for facility in _split(row.pop("facilities", None)):
+            facility_id = self.facilities.get(str(facility))
+            if facility_id is None:
+                errors.setdefault("facilities", []).append(
+                    f"Unknown facility '{facility}'."
+                )
+            else:
+                facility_ids.append(facility_id)
+
+        images = []
+        for image in _split(row.pop("images", None)):
+            if not isinstance(image, dict):
+                image = {"image": image}
+            name = str(image.get("image", ""))
+            error = self.check_image(name)
+            if error:
+                errors.setdefault("images", []).append(error)
+                continue
+            image = Image(image=name, description=image.get("description", ""))
+            if not name.startswith(ABSOLUTE_PREFIXES):
+                image.blob_id, image.variants = self.own_files[name]
+            images.append(image)
+
+        serializer = PlaceSerializer(data=row)
+        if not serializer.is_valid():
+            errors.update(serializer.errors)
+        if errors:
+            self.errors.append({"row": number, "errors": errors})
+            return None
+
+        place = Place(
+            owner=self.owner, category_id=category_id, **serializer.validated_data
+        )
+        try:
+            place.clean()
+        except ValidationError as e:
+            self.errors.append({"row": number, "errors": e.messages})
+            return None
+
+        if place.latitude is not None and place.longitude is not None:
+            place.geohash = encode_geohash(place.latitude, place.longitude)
+        return number, place, set(facility_ids), images
+
+    def check_image(self, name):
+        """Error message for an unusable `images` entry, None when it is fine."""
+        is_url = name.startswith(ABSOLUTE_PREFIXES)
+        extension = os.path.splitext(urlparse(name).path if is_url else name)[1]
+        if extension.lower().lstrip(".") not in IMAGE_EXTENSIONS:
+            return f"'{name}' is not a jpg, jpeg, png or webp file."
+        if len(name) > Image._meta.get_field("image").max_length:
+            return f"'{name}' is too long."
+        if is_url:
+            return None
+
+        if self.own_files is None:
+            self.own_files = {
+                image_name: (blob_id, variants)
+                for image_name, blob_id, variants in Image.objects.filter(
+                    place__owner=self.owner
+                ).values_list("image", "blob_id", "variants")
+            }
+        if name not in self.own_files:
+            return f"'{name}' is not one of your uploaded images."
+        if name not in self.existing_files:
+            self.existing_files[name] = default_storage.exists(name)
+        if not self.existing_files[name]:
+            return f"'{name}' does not exist in storage."
+        return None
+
+    def insert(self, chunk):
+        for attempt in range(Place.SLUG_ATTEMPTS):
+            slugs = allocate_unique_slugs(
+                Place, [Place.base_slug(place.title) for _, place, _, _ in chunk]
+            )
+            for (_, place, _, _), slug in zip(chunk, slugs):
+                place.slug = slug
+            try:
+                with transaction.atomic():
+                    self._insert(chunk)
+                self.created += len(chunk)
+                return
+            except IntegrityError as e:
+                # Most likely another writer took one of the slugs, so
+                # allocate again; report the chunk if it keeps failing
+                self._reset(chunk)
+                error = str(e)
+        for number, _, _, _ in chunk:
+            self.errors.append({"row": number, "errors": error})
+
+    def _reset(self, chunk):
+        # Objects keep the primary keys of the rolled back inserts
+        for _, place, _, images in chunk:
+            place.pk = None
+            place._state.adding = True
+            for image in images:
+                image.pk = None
+                image._state.adding = True
+
+    def _insert(self, chunk):
+        # bulk_create skips save() and signals, so do their work here
+        places = Place.objects.bulk_create([place for _, place, _, _ in chunk])
+        Place.refresh_search_vectors(
+            Place.objects.filter(pk__in=[place.pk for place in places])
+        )
+
+        through = Place.facilities.through
+        through.objects.bulk_create(
+            [
+                through(place_id=place.pk, facility_id=facility_id)
+                for _, place, facility_ids, _ in chunk
+                for facility_id in facility_ids
+            ]
+        )
+
+        images = []
+        for _, place, _, place_images in chunk:
+            for image in place_images:
+                image.place = place
+                images.append(image)
+        Image.objects.bulk_create(images)
+        # Reused files already have variants, external URLs get none
+        Image.schedule_variants(
+            [
+                image.pk
+                for image in images
+                if not image.variants
+                and not image.image.name.startswith(ABSOLUTE_PREFIXES)
+            ]
+        )
+        blob_refs = Counter(image.blob_id for image in images if image.blob_id)
+        for blob_id, count in blob_refs.items():
+            ImageBlob.objects.filter(pk=blob_id).update(
+                ref_count=F("ref_count") + count
+            )
+
+        HostStats.apply_hosted_places_delta(self.owner.pk, len(places))
+        bump_generation(CacheGeneration.PLACES)
+        if any(place.featured for place in places):
+            Place.schedule_featured_refresh()
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from place.images import delete_variants, generate_variants
+from place.models import Image, ImageBlob
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG variants for place images that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Regenerate variants for every image."
+        )
+
+    def handle(self, *args, **options):
+        images = (
+            Image.objects.all() if options["all"] else Image.objects.filter(variants={})
+        )
+
+        generated = 0
+        blob_ids = set()
+        for image in images.iterator():
+            # Images sharing a blob share its variants, render them once
+            if image.blob_id in blob_ids:
+                continue
+            try:
+                variants = generate_variants(image)
+            except Exception as e:
+                self.stderr.write(f"Image {image.pk}: {e}")
+                continue
+            if image.blob_id:
+                blob_ids.add(image.blob_id)
+                ImageBlob.objects.filter(pk=image.blob_id).update(variants=variants)
+                same_variants = Image.objects.filter(blob_id=image.blob_id)
+            else:
+                same_variants = Image.objects.filter(pk=image.pk)
+            # Variant names are unique per rendering, drop the replaced files
+            previous = list(
+                same_variants.exclude(variants={})
+                .values_list("variants", flat=True)
+                .distinct()
+            )
+            same_variants.update(variants=variants)
+            for old in previous:
+                delete_variants(old, image.image.storage)
+            generated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated variants for {generated} images.")
+        )
@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from place.importer import IMPORT_CHUNK_SIZE, PlaceImporter, detect_format, read_rows
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = "Import places from a CSV or JSONL file for one owner."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument(
+            "--owner", required=True, help="Email of the user who will own the places."
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format (defaults to the file extension).",
+        )
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        owner = User.objects.filter(email=options["owner"]).first()
+        if not owner:
+            raise CommandError(f"No user with email '{options['owner']}'.")
+
+        file_format = options["format"] or detect_format(options["path"])
+        importer = PlaceImporter(owner, chunk_size=options["chunk_size"])
+        try:
+            with open(options["path"], "rb") as stream:
+                report = importer.run(read_rows(stream, file_format))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} places, {report['failed']} rows failed."
+            )
+        )
@@ -0,0 +1,91 @@
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from place.configs import CacheGeneration
+from place.images import content_hashes, delete_variants
+from place.models import Image, ImageBlob, Place
+from utils.cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = (
+        "Link images uploaded before deduplication to content-hash blobs, "
+        "deleting files that duplicate an existing blob."
+    )
+
+    def handle(self, *args, **options):
+        linked = merged = 0
+        place_ids = set()
+
+        for image in Image.objects.filter(blob__isnull=True).iterator():
+            # Images sharing a file name are linked together below, so
+            # later rows of the iteration may already have a blob
+            if not Image.objects.filter(pk=image.pk, blob__isnull=True).exists():
+                continue
+            try:
+                with image.image.open("rb") as source:
+                    sha256, phash = content_hashes(source)
+                size = image.image.size
+            except Exception as e:
+                self.stderr.write(f"Image {image.pk}: {e}")
+                continue
+
+            with transaction.atomic():
+                same_file = Image.objects.filter(
+                    blob__isnull=True, image=image.image.name
+                )
+                blob = (
+                    ImageBlob.objects.select_for_update().filter(sha256=sha256).first()
+                )
+                # Images without a blob rendered their own variants, keep
+                # one set for the blob and delete the others
+                kept = image.variants if blob is None else blob.variants
+                rendered = same_file.exclude(variants={}).values_list(
+                    "variants", flat=True
+                )
+                for variants in rendered.distinct():
+                    if variants != kept:
+                        transaction.on_commit(
+                            partial(delete_variants, variants, image.image.storage)
+                        )
+                if blob is None:
+                    # The image's own file becomes the shared copy
+                    blob = ImageBlob.objects.create(
+                        sha256=sha256,
+                        phash=phash,
+                        file=image.image.name,
+                        size=size,
+                        variants=image.variants,
+                    )
+                    count = same_file.update(blob=blob, variants=kept)
+                    ImageBlob.objects.filter(pk=blob.pk).update(ref_count=count)
+                    linked += count
+                    continue
+
+                place_ids.update(same_file.values_list("place_id", flat=True))
+                count = same_file.update(
+                    blob=blob, image=blob.file.name, variants=blob.variants
+                )
+                ImageBlob.objects.filter(pk=blob.pk).update(
+                    ref_count=F("ref_count") + count
+                )
+                merged += count
+
+                # Imported images can already point at the blob's file
+                if image.image.name != blob.file.name:
+                    transaction.on_commit(
+                        partial(image.image.storage.delete, image.image.name)
+                    )
+
+        if place_ids:
+            Place.touch(place_ids)
+            bump_generation(CacheGeneration.PLACES)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Linked {linked} images to new blobs, merged {merged} duplicates."
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from place.models import Place
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized rating summary columns on places from their reviews."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--slug",
+            nargs="*",
+            help="Only rebuild the given place slugs (defaults to all places).",
+        )
+
+    def handle(self, *args, **options):
+        places = Place.objects.all()
+        if options["slug"]:
+            places = places.filter(slug__in=options["slug"])
+
+        reviewed = Place.rebuild_rating_summaries(places)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt rating summaries for {places.count()} places ({reviewed} with reviews)."
+            )
+        )
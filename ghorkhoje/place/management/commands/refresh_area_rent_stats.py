@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from place.configs import CacheGeneration
+from place.models import AreaRentStats
+from utils.cache import bump_generation
+
+
+class Command(BaseCommand):
+    help = "Recompute the rent statistics per city, area and bedroom count."
+
+    def handle(self, *args, **options):
+        groups = AreaRentStats.refresh()
+        bump_generation(CacheGeneration.RENT_STATS)
+        self.stdout.write(
+            self.style.SUCCESS(f"Refreshed rent statistics for {groups} groups.")
+        )
@@ -0,0 +1,116 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:00
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+RATING_FIELDS = [
+    'overall',
+    'cleanliness',
+    'description_match',
+    'location_convenience',
+    'value_for_money',
+    'neighborhood',
+]
+
+
+def backfill_rating_summary(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+    PlaceReview = apps.get_model('place', 'PlaceReview')
+
+    summaries = (
+        PlaceReview.objects.values('place_id')
+        .annotate(
+            review_count=Count('id'),
+            **{f'{field}_rating_sum': Sum(field) for field in RATING_FIELDS},
+        )
+        .order_by()
+    )
+    places = []
+    for summary in summaries:
+        place = Place(pk=summary['place_id'], review_count=summary['review_count'])
+        for field in RATING_FIELDS:
+            total = summary[f'{field}_rating_sum'] or 0
+            setattr(place, f'{field}_rating_sum', total)
+            setattr(place, f'{field}_rating_avg', total / place.review_count)
+        places.append(place)
+
+    update_fields = ['review_count']
+    for field in RATING_FIELDS:
+        update_fields += [f'{field}_rating_sum', f'{field}_rating_avg']
+    Place.objects.bulk_update(places, update_fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='cleanliness_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='cleanliness_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='description_match_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='description_match_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='location_convenience_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='location_convenience_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='neighborhood_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='neighborhood_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='overall_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='overall_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='value_for_money_rating_avg',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='value_for_money_rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_summary, migrations.RunPython.noop),
+    ]
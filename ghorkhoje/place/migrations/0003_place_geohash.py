@@ -0,0 +1,62 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=12):
+    # Copy of place.geo.encode_geohash as of this migration, so later
+    # changes to the app code cannot change what the migration does
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True  # geohash interleaves bits starting with longitude
+    while len(geohash) < precision:
+        value, value_range = (longitude, lng_range) if even_bit else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            value_range[0] = mid
+        else:
+            bits = bits << 1
+            value_range[1] = mid
+        even_bit = not even_bit
+
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def backfill_geohash(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+
+    places = []
+    for place in Place.objects.only('id', 'latitude', 'longitude').iterator():
+        place.geohash = encode_geohash(place.latitude, place.longitude)
+        places.append(place)
+    Place.objects.bulk_update(places, ['geohash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0002_place_rating_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12, null=True),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
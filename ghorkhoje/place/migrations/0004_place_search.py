@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+def backfill_search_vector(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+    Place.objects.update(
+        search_vector=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('city', 'area_name', weight='B', config='english')
+            + SearchVector('street_name', weight='C', config='english')
+            + SearchVector('description', weight='D', config='english')
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0003_place_geohash'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='place',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='places_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='places_title_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
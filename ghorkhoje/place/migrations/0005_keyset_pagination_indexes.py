@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0004_place_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['created_at', 'id'], name='places_created_99e133_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['rent_per_month', 'id'], name='places_rent_pe_c459e4_idx'),
+        ),
+    ]
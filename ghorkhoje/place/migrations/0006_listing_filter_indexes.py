@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0005_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['city', 'rent_per_month'], name='places_listed_city_rent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['city', 'area_name', 'rent_per_month'], name='places_listed_area_rent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['num_of_bedrooms', 'rent_per_month'], name='places_listed_bedrooms_idx'),
+        ),
+    ]
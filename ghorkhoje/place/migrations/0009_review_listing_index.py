@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0008_image_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='placereview',
+            index=models.Index(fields=['place', 'created_at'], name='place_revie_place_i_a430a3_idx'),
+        ),
+    ]
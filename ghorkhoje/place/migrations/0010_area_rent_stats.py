@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0009_review_listing_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AreaRentStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('city', models.CharField(max_length=255)),
+                ('area_name', models.CharField(max_length=255)),
+                ('num_of_bedrooms', models.IntegerField()),
+                ('listing_count', models.PositiveIntegerField(default=0)),
+                ('rent_p25', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('rent_median', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('rent_p75', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('mean_rent_per_sqft', models.DecimalField(blank=True, decimal_places=2, max_digits=15, null=True)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'area_rent_stats',
+                'constraints': [models.UniqueConstraint(fields=('city', 'area_name', 'num_of_bedrooms'), name='area_rent_stats_unique_group')],
+            },
+        ),
+    ]
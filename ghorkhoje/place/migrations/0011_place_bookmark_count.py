@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:33
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_bookmark_count(apps, schema_editor):
+    Place = apps.get_model('place', 'Place')
+    Bookmark = apps.get_model('place', 'Bookmark')
+
+    counts = (
+        Bookmark.places.through.objects.values('place_id')
+        .annotate(bookmark_count=Count('id'))
+        .order_by()
+    )
+    places = [
+        Place(pk=count['place_id'], bookmark_count=count['bookmark_count'])
+        for count in counts
+    ]
+    Place.objects.bulk_update(places, ['bookmark_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('place', '0010_area_rent_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_bookmark_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['bookmark_count', 'id'], name='places_listed_popular_idx'),
+        ),
+    ]
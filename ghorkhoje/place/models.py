@@ -1,12 +1,35 @@
-from django.db import models
-from django.db.models import Avg
+import traceback
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    Aggregate,
+    Avg,
+    Count,
+    F,
+    FloatField,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Upper
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.text import slugify
 
-from user.models import User
-from utils.functions import validate_image_size, unique_image_path, validate_image_file
-from place.configs import AppointmentStatus
+from user.models import User, HostStats, Review
+from utils.functions import (
+    next_available_slug,
+    validate_image_size,
+    unique_image_path,
+    validate_image_file,
+)
+from place.configs import AppointmentStatus, PlaceRating, ReviewListing
+from place.geo import encode_geohash
+from place.images import content_hashes, delete_variants, strip_metadata
 
 from django.conf import settings
 
@@ -66,6 +89,59 @@ class Facility(models.Model):
         verbose_name_plural = "Facilities"
 
 
+def place_search_vector():
+    return (
+        SearchVector("title", weight="A", config="english")
+        + SearchVector("city", "area_name", weight="B", config="english")
+        + SearchVector("street_name", weight="C", config="english")
+        + SearchVector("description", weight="D", config="english")
+    )
+
+
+class PlaceQuerySet(models.QuerySet):
+    def rating_summary(self):
+        """
+        Average of every rating dimension over the reviewed places in this
+        queryset, plus their total review count, in one aggregate query.
+        """
+        summary = self.filter(review_count__gt=0).aggregate(
+            review_count=Sum("review_count"),
+            **{field: Avg(f"{field}_rating_avg") for field in PlaceRating.FIELDS},
+        )
+        return {key: value or 0 for key, value in summary.items()}
+
+    def with_details(self):
+        """
+        Load everything PlaceDetailsSerializer reads: the place joined with
+        owner, host stats and category and annotated with its area median
+        rent, plus one query per prefetched relation, however many images
+        or reviews there are.
+        """
+        return (
+            self.select_related("owner", "owner__host_stats", "category")
+            .annotate(area_rent_median=AreaRentStats.median_subquery())
+            .prefetch_related(
+                Prefetch("facilities", queryset=Facility.objects.all()),
+                Prefetch("images", queryset=Image.objects.all()),
+                # Only the latest reviews are embedded, the rest are paginated
+                Prefetch(
+                    "reviews",
+                    queryset=PlaceReview.objects.select_related("reviewer").order_by(
+                        "-created_at", "-id"
+                    )[: ReviewListing.LATEST_COUNT],
+                    to_attr="latest_reviews",
+                ),
+                Prefetch(
+                    "owner__received_reviews",
+                    queryset=Review.objects.select_related("reviewer").order_by(
+                        "-created_at", "-id"
+                    )[: ReviewListing.LATEST_COUNT],
+                    to_attr="latest_received_reviews",
+                ),
+            )
+        )
+
+
 class Place(TimestampedModel):
     title = models.CharField(max_length=255)
     slug = models.SlugField(max_length=300, unique=True, blank=True, null=True)
@@ -102,6 +178,7 @@ class Place(TimestampedModel):
         db_index=True,
     )
     longitude = models.DecimalField(max_digits=25, decimal_places=15, db_index=True)
+    geohash = models.CharField(max_length=12, null=True, blank=True, db_index=True)
     area_in_sqft = models.IntegerField(null=True, blank=True)
     num_of_bedrooms = models.IntegerField(default=1)
     num_of_bathrooms = models.IntegerField(default=1)
@@ -127,6 +204,39 @@ class Place(TimestampedModel):
     is_deleted = models.BooleanField(verbose_name="Archived", default=False)
     is_approved = models.BooleanField(verbose_name="Approved", default=False)
 
+    objects = PlaceQuerySet.as_manager()
+
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    # Kept in sync by place.bookmarks.bookmark_place and the bookmark signals
+    bookmark_count = models.PositiveIntegerField(default=0)
+
+    # Rating summary, kept in sync with PlaceReview writes
+    review_count = models.PositiveIntegerField(default=0)
+    overall_rating_sum = models.PositiveIntegerField(default=0)
+    overall_rating_avg = models.FloatField(default=0)
+    cleanliness_rating_sum = models.PositiveIntegerField(default=0)
+    cleanliness_rating_avg = models.FloatField(default=0)
+    description_match_rating_sum = models.PositiveIntegerField(default=0)
+    description_match_rating_avg = models.FloatField(default=0)
+    location_convenience_rating_sum = models.PositiveIntegerField(default=0)
+    location_convenience_rating_avg = models.FloatField(default=0)
+    value_for_money_rating_sum = models.PositiveIntegerField(default=0)
+    value_for_money_rating_avg = models.FloatField(default=0)
+    neighborhood_rating_sum = models.PositiveIntegerField(default=0)
+    neighborhood_rating_avg = models.FloatField(default=0)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember loaded values that save() needs to detect changes of
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in ("owner_id", "featured")
+        }
+        return instance
+
     def clean(self):
         if not (20.5 <= self.latitude <= 26.6):
             raise ValidationError(
@@ -140,69 +250,236 @@ class Place(TimestampedModel):
         if self.rent_per_month < 0:
             raise ValidationError("Rent per month cannot be negative.")
 
-    def save(self, *args, **kwargs):
-        if not self.slug:  # Auto-generate slug only if it's empty
-            base_slug = slugify(self.title)
-            slug = base_slug
-            counter = 1
-            while Place.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
+    SLUG_ATTEMPTS = 3
+    # Only written through their F() helpers (apply_rating_delta,
+    # bookmark_place, recount_bookmarks), never from a loaded instance
+    DENORMALIZED_FIELDS = {
+        "search_vector",
+        "bookmark_count",
+        "review_count",
+        *(f"{field}_rating_sum" for field in PlaceRating.FIELDS),
+        *(f"{field}_rating_avg" for field in PlaceRating.FIELDS),
+    }
 
-        super().save(*args, **kwargs)
+    def save(self, *args, **kwargs):
+        updating = not self._state.adding and not kwargs.get("force_insert")
+        if updating and kwargs.get("update_fields") is None:
+            # A full save would write back counters read before concurrent
+            # reviews or bookmarks changed them
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DENORMALIZED_FIELDS
+                and field.attname not in deferred
+            ]
+
+        generate_slug = not self.slug  # Auto-generate slug only if it's empty
+        if generate_slug:
+            self.slug = next_available_slug(Place, Place.base_slug(self.title))
+
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+
+        adding = self._state.adding
+        loaded_values = getattr(self, "_loaded_values", {})
+        previous_owner_id = loaded_values.get("owner_id")
+        was_featured = loaded_values.get("featured")
+        with transaction.atomic():
+            for attempt in range(self.SLUG_ATTEMPTS):
+                try:
+                    with transaction.atomic():
+                        super().save(*args, **kwargs)
+                    break
+                except IntegrityError:
+                    # A concurrent insert took the slug, pick the next one
+                    if not generate_slug or attempt + 1 == self.SLUG_ATTEMPTS:
+                        raise
+                    if not Place.objects.filter(slug=self.slug).exists():
+                        raise
+                    self.slug = next_available_slug(Place, Place.base_slug(self.title))
+            Place.refresh_search_vectors(Place.objects.filter(pk=self.pk))
+
+            # Keep the owner's hosted places count in step
+            if adding:
+                HostStats.apply_hosted_places_delta(self.owner_id, 1)
+            elif previous_owner_id and previous_owner_id != self.owner_id:
+                HostStats.apply_hosted_places_delta(previous_owner_id, -1)
+                HostStats.apply_hosted_places_delta(self.owner_id, 1)
+
+            # The featured snapshot holds a card for every featured place
+            if self.featured or was_featured:
+                Place.schedule_featured_refresh()
+        self._loaded_values = {"owner_id": self.owner_id, "featured": self.featured}
+
+    @staticmethod
+    def base_slug(title):
+        # Titles that slugify to nothing (e.g. Bangla only) still need a slug
+        return slugify(title) or "place"
+
+    @staticmethod
+    def schedule_featured_refresh():
+        from place.tasks import refresh_featured_places
+
+        def enqueue():
+            try:
+                refresh_featured_places.delay()
+            except Exception:
+                traceback.print_exc()
+
+        transaction.on_commit(enqueue)
+
+    @classmethod
+    def refresh_search_vectors(cls, queryset):
+        return queryset.update(search_vector=place_search_vector())
+
+    def get_rating_summary(self):
+        # Served from the denormalized columns, no query needed
+        summary = {"review_count": self.review_count}
+        for field in PlaceRating.FIELDS:
+            summary[field] = getattr(self, f"{field}_rating_avg")
+        return summary
 
     def get_average_cleanliness_rating(self):
-        return (
-            PlaceReview.objects.filter(place=self, cleanliness__isnull=False).aggregate(
-                Avg("cleanliness")
-            )["cleanliness__avg"]
-            or 0
-        )
+        return self.cleanliness_rating_avg
 
     def get_average_description_match_rating(self):
-        return (
-            PlaceReview.objects.filter(
-                place=self, description_match__isnull=False
-            ).aggregate(Avg("description_match"))["description_match__avg"]
-            or 0
-        )
+        return self.description_match_rating_avg
 
     def get_average_location_convenience_rating(self):
-        return (
-            PlaceReview.objects.filter(
-                place=self, location_convenience__isnull=False
-            ).aggregate(Avg("location_convenience"))["location_convenience__avg"]
-            or 0
-        )
+        return self.location_convenience_rating_avg
 
     def get_average_value_for_money_rating(self):
-        return (
-            PlaceReview.objects.filter(
-                place=self, value_for_money__isnull=False
-            ).aggregate(Avg("value_for_money"))["value_for_money__avg"]
-            or 0
-        )
+        return self.value_for_money_rating_avg
 
     def get_average_neighborhood_rating(self):
-        return (
-            PlaceReview.objects.filter(
-                place=self, neighborhood__isnull=False
-            ).aggregate(Avg("neighborhood"))["neighborhood__avg"]
-            or 0
-        )
+        return self.neighborhood_rating_avg
 
     def get_average_overall(self):
-        return (
-            PlaceReview.objects.filter(place=self, overall__isnull=False).aggregate(
-                Avg("overall")
-            )["overall__avg"]
-            or 0
+        return self.overall_rating_avg
+
+    @classmethod
+    def apply_rating_delta(cls, place_id, count_delta, rating_deltas):
+        """
+        Shift the rating summary of a place in a single UPDATE statement.
+        `rating_deltas` maps every PlaceRating field to the change of its sum.
+        Also advances updated_at, which versions the place's detail payload.
+        """
+        new_count = F("review_count") + count_delta
+        updates = {"review_count": new_count, "updated_at": timezone.now()}
+        for field in PlaceRating.FIELDS:
+            new_sum = F(f"{field}_rating_sum") + rating_deltas[field]
+            updates[f"{field}_rating_sum"] = new_sum
+            updates[f"{field}_rating_avg"] = Coalesce(
+                Cast(new_sum, FloatField()) / NullIf(new_count, 0), 0.0
+            )
+        cls.objects.filter(pk=place_id).update(**updates)
+
+    @classmethod
+    def touch(cls, place_ids):
+        """
+        Advance updated_at for places whose related rows (images, facilities)
+        changed, so it keeps versioning the place's detail payload.
+        """
+        cls.objects.filter(pk__in=place_ids).update(updated_at=timezone.now())
+
+    @classmethod
+    def recount_bookmarks(cls, place_ids):
+        """Recompute bookmark_count of the given places from the bookmark rows."""
+        counts = (
+            cls.bookmarks.through.objects.filter(place_id=OuterRef("pk"))
+            .order_by()
+            .values("place_id")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        cls.objects.filter(pk__in=place_ids).update(
+            bookmark_count=Coalesce(Subquery(counts), 0)
+        )
+
+    @classmethod
+    def rebuild_rating_summaries(cls, queryset=None):
+        """
+        Recompute the rating summary columns from place_reviews.
+        Returns the number of places that have at least one review.
+        """
+        places = cls.objects.all() if queryset is None else queryset
+        reset = {"review_count": 0}
+        for field in PlaceRating.FIELDS:
+            reset[f"{field}_rating_sum"] = 0
+            reset[f"{field}_rating_avg"] = 0
+
+        summaries = (
+            PlaceReview.objects.filter(place__in=places.values("pk"))
+            .values("place_id")
+            .annotate(
+                review_count=Count("id"),
+                **{f"{field}_rating_sum": Sum(field) for field in PlaceRating.FIELDS},
+            )
+            .order_by()
         )
 
+        with transaction.atomic():
+            places.update(**reset)
+            to_update = []
+            for summary in summaries:
+                place = cls(
+                    pk=summary["place_id"], review_count=summary["review_count"]
+                )
+                for field in PlaceRating.FIELDS:
+                    total = summary[f"{field}_rating_sum"] or 0
+                    setattr(place, f"{field}_rating_sum", total)
+                    setattr(place, f"{field}_rating_avg", total / place.review_count)
+                to_update.append(place)
+
+            cls.objects.bulk_update(to_update, list(reset), batch_size=500)
+        return len(to_update)
+
     class Meta:
         indexes = [
             models.Index(fields=["latitude", "longitude"]),
+            # Keyset pagination over the list sort options
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["rent_per_month", "id"]),
+            GinIndex(fields=["search_vector"], name="places_search_vector_gin"),
+            GinIndex(
+                fields=["title"],
+                name="places_title_trgm_gin",
+                opclasses=["gin_trgm_ops"],
+            ),
+            # icontains compiles to UPPER(column) LIKE, so substring search
+            # needs trigram indexes on that expression
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="places_title_upper_trgm_gin",
+            ),
+            GinIndex(
+                OpClass(Upper("description"), name="gin_trgm_ops"),
+                name="places_desc_upper_trgm_gin",
+            ),
+            # Listing filters, limited to rows the public list can return
+            models.Index(
+                fields=["city", "rent_per_month"],
+                name="places_listed_city_rent_idx",
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=["city", "area_name", "rent_per_month"],
+                name="places_listed_area_rent_idx",
+                condition=models.Q(is_available=True),
+            ),
+            models.Index(
+                fields=["num_of_bedrooms", "rent_per_month"],
+                name="places_listed_bedrooms_idx",
+                condition=models.Q(is_available=True),
+            ),
+            # Popularity sort, keyset paginated
+            models.Index(
+                fields=["bookmark_count", "id"],
+                name="places_listed_popular_idx",
+                condition=models.Q(is_available=True),
+            ),
         ]
         db_table = "places"
 
@@ -210,8 +487,135 @@ class Place(TimestampedModel):
         return f"ID:{self.id}, Title: {self.title}, City: {self.city}"
 
 
+class ImageBlob(TimestampedModel):
+    """
+    One stored image file shared by every Image with the same bytes.
+    `ref_count` counts those Images; the file and its variants are deleted
+    when it drops to zero.
+    """
+
+    ACQUIRE_ATTEMPTS = 3
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    # dHash for finding near duplicates, e.g. re-encoded copies
+    phash = models.CharField(max_length=16, db_index=True)
+    file = models.ImageField(upload_to=unique_image_path)
+    size = models.PositiveIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    variants = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        db_table = "image_blobs"
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+    @classmethod
+    def prepare(cls, upload):
+        """
+        Hash `upload` and store its file unless a blob has the bytes already.
+        Returns an unsaved blob for acquire(). Call it before opening the
+        transaction that references the blob, so decoding and the storage
+        upload hold no locks, and pass it to discard_unused() afterwards.
+        """
+        sha256, phash = content_hashes(upload)
+        blob = cls(sha256=sha256, phash=phash, size=upload.size)
+        blob.upload = upload
+        if not cls.objects.filter(sha256=sha256).exists():
+            blob.store_upload()
+        return blob
+
+    @classmethod
+    def acquire(cls, prepared):
+        """
+        Return the blob holding the bytes of a prepare()d upload with one
+        more reference, inserting `prepared` when no blob has them yet.
+        """
+        for attempt in range(cls.ACQUIRE_ATTEMPTS):
+            blob = cls.objects.filter(sha256=prepared.sha256).first()
+            if blob is not None:
+                # Zero rows means a concurrent release deleted it, start over
+                if cls.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1):
+                    blob.ref_count += 1
+                    return blob
+                continue
+
+            if not prepared.file.name:
+                # The blob prepare() found was released since
+                prepared.store_upload()
+            prepared.ref_count = 1
+            try:
+                with transaction.atomic():
+                    prepared.save()
+                return prepared
+            except IntegrityError:
+                # Another upload of the same bytes was inserted first
+                pass
+        raise IntegrityError(f"Could not store image blob {prepared.sha256}.")
+
+    def store_upload(self):
+        # The stored original is served as is, so it is kept without metadata
+        stripped = strip_metadata(self.upload)
+        self.size = stripped.size
+        self.file.save(stripped.name, stripped, save=False)
+
+    @classmethod
+    def discard_unused(cls, prepared):
+        """
+        Delete files stored by prepare() that no blob row uses, e.g. after
+        the transaction acquiring them rolled back or another copy of the
+        same bytes won. Call once that transaction has ended.
+        """
+        for blob in prepared:
+            name = blob.file.name
+            if name and not cls.objects.filter(file=name).exists():
+                blob.file.storage.delete(name)
+
+    @classmethod
+    def release(cls, blob_id):
+        """
+        Drop one reference and delete the blob, its file and variants once
+        nothing references it. Call inside the transaction removing the
+        reference; the row lock taken here serializes it with acquire().
+        """
+        cls.objects.filter(pk=blob_id, ref_count__gt=0).update(
+            ref_count=F("ref_count") - 1
+        )
+        blob = cls.objects.filter(pk=blob_id, ref_count=0).first()
+        if blob is None:
+            return
+
+        # Images imported or stored before deduplication can use the same
+        # file without referencing the blob; adopt them instead of deleting
+        adopted = Image.objects.filter(blob__isnull=True, image=blob.file.name).update(
+            blob=blob
+        )
+        if adopted:
+            cls.objects.filter(pk=blob.pk).update(ref_count=adopted)
+            return
+        blob.delete()
+
+        storage = blob.file.storage
+        name = blob.file.name
+        variants = blob.variants
+
+        def remove_files():
+            storage.delete(name)
+            delete_variants(variants, storage)
+
+        transaction.on_commit(remove_files)
+
+
 class Image(TimestampedModel):
     place = models.ForeignKey(Place, related_name="images", on_delete=models.CASCADE)
+    # Shared file; Images created before deduplication have none
+    blob = models.ForeignKey(
+        ImageBlob,
+        related_name="images",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+    )
     image = models.ImageField(
         upload_to=unique_image_path,
         validators=[
@@ -220,10 +624,51 @@ class Image(TimestampedModel):
         ],
     )
     description = models.TextField(null=True, blank=True)
+    # Resized WebP/JPEG renditions, filled in by a background task
+    variants = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"Image for Place ID {self.place.id}"
 
+    def save(self, *args, **kwargs):
+        if not self.image or self.image._committed:
+            return super().save(*args, **kwargs)
+
+        # A new file: share the stored copy of identical bytes if there is one
+        prepared = ImageBlob.prepare(self.image.file)
+        try:
+            with transaction.atomic():
+                previous_blob_id = self.blob_id
+                self.use_blob(ImageBlob.acquire(prepared))
+                super().save(*args, **kwargs)
+                if previous_blob_id:
+                    ImageBlob.release(previous_blob_id)
+        finally:
+            ImageBlob.discard_unused([prepared])
+
+    def use_blob(self, blob):
+        """Point this image at `blob`, reusing variants it already has."""
+        self.blob = blob
+        self.image = blob.file.name
+        self.variants = blob.variants
+
+    def variant_name(self, name, key="jpeg"):
+        """Storage name of a variant, falling back to the original upload."""
+        return self.variants.get(name, {}).get(key) or self.image.name
+
+    @staticmethod
+    def schedule_variants(image_ids):
+        from place.tasks import generate_image_variants
+
+        def enqueue():
+            for image_id in image_ids:
+                try:
+                    generate_image_variants.delay(image_id)
+                except Exception:
+                    traceback.print_exc()
+
+        transaction.on_commit(enqueue)
+
 
 class PlaceReview(TimestampedModel):
     place = models.ForeignKey(Place, related_name="reviews", on_delete=models.CASCADE)
@@ -255,8 +700,15 @@ class PlaceReview(TimestampedModel):
 
     class Meta:
         db_table = "place_reviews"
+        indexes = [
+            # Review listing of a place, newest first
+            models.Index(fields=["place", "created_at"]),
+        ]
         verbose_name_plural = "Place Reviews"
 
+    def get_ratings(self):
+        return {field: getattr(self, field) for field in PlaceRating.FIELDS}
+
     def save(self, *args, **kwargs):
         self.overall = (
             self.cleanliness
@@ -264,7 +716,36 @@ class PlaceReview(TimestampedModel):
             + self.location_convenience
             + self.value_for_money
         ) // 4
-        super().save(*args, **kwargs)
+
+        # Keep Place's rating summary in step with this review
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = (
+                    PlaceReview.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values("place_id", *PlaceRating.FIELDS)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
+            ratings = self.get_ratings()
+            if previous is None:
+                Place.apply_rating_delta(self.place_id, 1, ratings)
+            elif previous["place_id"] != self.place_id:
+                Place.apply_rating_delta(
+                    previous["place_id"],
+                    -1,
+                    {field: -previous[field] for field in PlaceRating.FIELDS},
+                )
+                Place.apply_rating_delta(self.place_id, 1, ratings)
+            else:
+                # Applied even when only the text changed, to advance updated_at
+                deltas = {
+                    field: ratings[field] - previous[field]
+                    for field in PlaceRating.FIELDS
+                }
+                Place.apply_rating_delta(self.place_id, 0, deltas)
 
 
 class Bookmark(models.Model):
@@ -280,3 +761,99 @@ class Bookmark(models.Model):
         db_table = "bookmarks"
         verbose_name = "Bookmark"
         verbose_name_plural = "Bookmarks"
+
+
+class Percentile(Aggregate):
+    """PostgreSQL PERCENTILE_CONT(fraction) WITHIN GROUP (ORDER BY expression)."""
+
+    function = "PERCENTILE_CONT"
+    template = "%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class AreaRentStats(models.Model):
+    """
+    Rent distribution of listed places per city, area and bedroom count,
+    recomputed by a periodic task instead of aggregating `places` per request.
+    """
+
+    city = models.CharField(max_length=255)
+    area_name = models.CharField(max_length=255)
+    num_of_bedrooms = models.IntegerField()
+    listing_count = models.PositiveIntegerField(default=0)
+    rent_p25 = models.DecimalField(max_digits=15, decimal_places=2)
+    rent_median = models.DecimalField(max_digits=15, decimal_places=2)
+    rent_p75 = models.DecimalField(max_digits=15, decimal_places=2)
+    # Over listings with an area only
+    mean_rent_per_sqft = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True
+    )
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "area_rent_stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["city", "area_name", "num_of_bedrooms"],
+                name="area_rent_stats_unique_group",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.area_name}, {self.city} ({self.num_of_bedrooms} bed)"
+
+    @classmethod
+    def refresh(cls):
+        """
+        Recompute every group in one aggregate query and upsert the rows;
+        groups without listed places any more are removed.
+        """
+        refreshed_at = timezone.now()
+        groups = (
+            Place.objects.filter(is_available=True)
+            .values("city", "area_name", "num_of_bedrooms")
+            .annotate(
+                listing_count=Count("id"),
+                rent_p25=Percentile("rent_per_month", 0.25),
+                rent_median=Percentile("rent_per_month", 0.5),
+                rent_p75=Percentile("rent_per_month", 0.75),
+                mean_rent_per_sqft=Avg(
+                    Cast("rent_per_month", FloatField()) / NullIf("area_in_sqft", 0),
+                    output_field=FloatField(),
+                ),
+            )
+            .order_by()
+        )
+        rows = [cls(**group, refreshed_at=refreshed_at) for group in groups]
+
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                rows,
+                batch_size=1000,
+                update_conflicts=True,
+                unique_fields=["city", "area_name", "num_of_bedrooms"],
+                update_fields=[
+                    "listing_count",
+                    "rent_p25",
+                    "rent_median",
+                    "rent_p75",
+                    "mean_rent_per_sqft",
+                    "refreshed_at",
+                ],
+            )
+            cls.objects.filter(refreshed_at__lt=refreshed_at).delete()
+        return len(rows)
+
+    @classmethod
+    def median_subquery(cls):
+        """Area median rent of the outer place row, for annotating places."""
+        return Subquery(
+            cls.objects.filter(
+                city=OuterRef("city"),
+                area_name=OuterRef("area_name"),
+                num_of_bedrooms=OuterRef("num_of_bedrooms"),
+            ).values("rent_median")[:1]
+        )
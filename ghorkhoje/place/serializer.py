@@ -4,7 +4,18 @@ from rest_framework import serializers
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
-from place.models import Place, Facility, Category, Image, PlaceReview
+from place.bookmarks import request_bookmarked_place_ids
+from place.configs import ImageVariants, ReviewListing
+from place.models import (
+    AreaRentStats,
+    Category,
+    Facility,
+    Image,
+    ImageBlob,
+    Place,
+    PlaceReview,
+)
+from utils.media import MediaModelSerializer, media_url
 from user.models import User, Review
 
 
@@ -16,11 +27,7 @@ class FacilitySerializer(serializers.ModelSerializer):
         fields = ("id", "name", "description", "slug", "bill", "icon")
 
     def get_icon(self, instance):
-        request = self.context.get("request")
-        if instance.icon:
-            icon_url = instance.icon.url if hasattr(instance.icon, "url") else None
-            return request.build_absolute_uri(icon_url) if icon_url else None
-        return None
+        return media_url(instance.icon, self.context.get("request"))
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -31,17 +38,10 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ("id", "name", "slug", "icon", "description")
 
     def get_icon(self, instance):
-        request = self.context.get("request")
-        if instance.icon:
-            return (
-                request.build_absolute_uri(instance.icon.url)
-                if hasattr(instance.icon, "url")
-                else None
-            )
-        return None
+        return media_url(instance.icon, self.context.get("request"))
 
 
-class ReviewerSerializer(serializers.ModelSerializer):
+class ReviewerSerializer(MediaModelSerializer):
     class Meta:
         model = User
         fields = ["id", "full_name", "profile_image"]
@@ -79,13 +79,60 @@ class ReviewSerializer(serializers.ModelSerializer):
         return None
 
 
-class ImageSerializer(serializers.ModelSerializer):
+def latest_reviews(instance, attr, related_name):
+    # Detail views prefetch the latest reviews into `attr`
+    if hasattr(instance, attr):
+        return getattr(instance, attr)
+    return (
+        getattr(instance, related_name)
+        .select_related("reviewer")
+        .order_by("-created_at", "-id")[: ReviewListing.LATEST_COUNT]
+    )
+
+
+def _first_image(instance):
+    if hasattr(instance, "first_image"):
+        return instance.first_image[0] if instance.first_image else None
+    return instance.images.first()
+
+
+class ImageSerializer(MediaModelSerializer):
+    variants = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Image
-        fields = ["id", "image", "description"]
+        fields = ["id", "image", "description", "variants", "srcset"]
+
+    def get_variants(self, instance):
+        request = self.context.get("request")
+        return {
+            name: {
+                "width": variant["width"],
+                **{
+                    key: media_url(variant[key], request)
+                    for key in ImageVariants.FORMATS
+                },
+            }
+            for name, variant in instance.variants.items()
+        }
+
+    def get_srcset(self, instance):
+        # e.g. {"webp": "<url> 480w, <url> 1024w, ...", "jpeg": "..."}
+        if not instance.variants:
+            return None
+        request = self.context.get("request")
+        variants = sorted(instance.variants.values(), key=lambda v: v["width"])
+        return {
+            key: ", ".join(
+                f"{media_url(variant[key], request)} {variant['width']}w"
+                for variant in variants
+            )
+            for key in ImageVariants.FORMATS
+        }
 
 
-class OwnerSerializer(serializers.ModelSerializer):
+class OwnerSerializer(MediaModelSerializer):
     rating = serializers.SerializerMethodField()
     communication_rating = serializers.SerializerMethodField()
     cleanliness_rating = serializers.SerializerMethodField()
@@ -94,6 +141,7 @@ class OwnerSerializer(serializers.ModelSerializer):
     financial_transparency_rating = serializers.SerializerMethodField()
     attitude_rating = serializers.SerializerMethodField()
     reviews = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
     hosted_places = serializers.SerializerMethodField()
 
     class Meta:
@@ -112,6 +160,7 @@ class OwnerSerializer(serializers.ModelSerializer):
             "financial_transparency_rating",
             "attitude_rating",
             "reviews",
+            "review_count",
             "profile_image",
         ]
 
@@ -137,11 +186,17 @@ class OwnerSerializer(serializers.ModelSerializer):
         return instance.get_average_attitude_rating()
 
     def get_hosted_places(self, instance):
-        return Place.objects.filter(owner=instance).count()
+        return instance.get_hosted_places_count()
 
     def get_reviews(self, instance):
-        reviews = instance.received_reviews.all()
-        return ReviewSerializer(reviews, many=True).data
+        # The rest are served by /user/about-host/<pk>/reviews/
+        reviews = latest_reviews(
+            instance, "latest_received_reviews", "received_reviews"
+        )
+        return ReviewSerializer(reviews, many=True, context=self.context).data
+
+    def get_review_count(self, instance):
+        return instance.get_review_count()
 
 
 class PlaceReviewCreateUpdateSerializer(serializers.ModelSerializer):
@@ -162,6 +217,8 @@ class PlaceListSerializer(serializers.ModelSerializer):
     owner_full_name = serializers.SerializerMethodField()
     avg_rating = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    image_webp = serializers.SerializerMethodField()
+    is_bookmarked = serializers.SerializerMethodField()
 
     class Meta:
         model = Place
@@ -173,27 +230,53 @@ class PlaceListSerializer(serializers.ModelSerializer):
             "rent_per_month",
             "avg_rating",
             "image",
+            "image_webp",
+            "is_bookmarked",
         ]
 
     def get_image(self, instance):
-        request = self.context.get("request")
-        if hasattr(instance, "first_image") and instance.first_image:
-            first_image = instance.first_image[0]
-        else:
-            first_image = instance.images.first()
-        return request.build_absolute_uri(first_image.image.url)
+        first_image = _first_image(instance)
+        if first_image is None:
+            return None
+        return media_url(first_image.variant_name("card"), self.context.get("request"))
+
+    def get_image_webp(self, instance):
+        first_image = _first_image(instance)
+        if first_image is None or "card" not in first_image.variants:
+            return None
+        return media_url(
+            first_image.variant_name("card", "webp"), self.context.get("request")
+        )
 
     def get_owner_full_name(self, instance):
         return instance.owner.full_name
 
     def get_avg_rating(self, instance):
-        return instance.get_average_overall()
+        return instance.overall_rating_avg
+
+    def get_is_bookmarked(self, instance):
+        return instance.id in request_bookmarked_place_ids(self.context.get("request"))
+
+
+class PlaceNearbySerializer(PlaceListSerializer):
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(PlaceListSerializer.Meta):
+        fields = PlaceListSerializer.Meta.fields + [
+            "latitude",
+            "longitude",
+            "distance_km",
+        ]
+
+    def get_distance_km(self, instance):
+        return round(instance.distance, 2)
 
 
 class PlaceListOwnerSerializer(serializers.ModelSerializer):
     owner_full_name = serializers.SerializerMethodField()
     avg_rating = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
+    image_webp = serializers.SerializerMethodField()
     category = CategorySerializer()
 
     class Meta:
@@ -206,22 +289,29 @@ class PlaceListOwnerSerializer(serializers.ModelSerializer):
             "rent_per_month",
             "avg_rating",
             "image",
+            "image_webp",
             "category",
         ]
 
     def get_image(self, instance):
-        request = self.context.get("request")
-        if hasattr(instance, "first_image") and instance.first_image:
-            first_image = instance.first_image[0]
-        else:
-            first_image = instance.images.first()
-        return request.build_absolute_uri(first_image.image.url)
+        first_image = _first_image(instance)
+        if first_image is None:
+            return None
+        return media_url(first_image.variant_name("card"), self.context.get("request"))
+
+    def get_image_webp(self, instance):
+        first_image = _first_image(instance)
+        if first_image is None or "card" not in first_image.variants:
+            return None
+        return media_url(
+            first_image.variant_name("card", "webp"), self.context.get("request")
+        )
 
     def get_owner_full_name(self, instance):
         return instance.owner.full_name
 
     def get_avg_rating(self, instance):
-        return instance.get_average_overall()
+        return instance.overall_rating_avg
 
 
 class PlaceDetailsSerializer(serializers.ModelSerializer):
@@ -231,7 +321,9 @@ class PlaceDetailsSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     images = ImageSerializer(many=True, required=False)
     reviews = serializers.SerializerMethodField()
+    review_count = serializers.IntegerField(read_only=True)
     avg_ratings = serializers.SerializerMethodField()
+    area_rent_comparison = serializers.SerializerMethodField()
 
     class Meta:
         model = Place
@@ -276,23 +368,50 @@ class PlaceDetailsSerializer(serializers.ModelSerializer):
             "featured",
             "is_active",
             "reviews",
+            "review_count",
             "avg_ratings",
+            "area_rent_comparison",
         ]
 
     def get_avg_ratings(self, instance):
+        summary = instance.get_rating_summary()
         res = {
-            "cleanliness": instance.get_average_cleanliness_rating(),
-            "description_match": instance.get_average_description_match_rating(),
-            "location_convenience": instance.get_average_location_convenience_rating(),
-            "value_for_money": instance.get_average_value_for_money_rating(),
-            "neighborhood": instance.get_average_neighborhood_rating(),
-            "overall": instance.get_average_overall(),
+            "cleanliness": summary["cleanliness"],
+            "description_match": summary["description_match"],
+            "location_convenience": summary["location_convenience"],
+            "value_for_money": summary["value_for_money"],
+            "neighborhood": summary["neighborhood"],
+            "overall": summary["overall"],
         }
         return res
 
     def get_reviews(self, instance):
-        reviews = instance.reviews.all()
-        return PlaceReviewSerializer(reviews, many=True).data
+        # The rest are served by /places/<slug>/reviews/
+        reviews = latest_reviews(instance, "latest_reviews", "reviews")
+        return PlaceReviewSerializer(reviews, many=True, context=self.context).data
+
+    def get_area_rent_comparison(self, instance):
+        # Annotated by Place.objects.with_details(), looked up otherwise
+        if hasattr(instance, "area_rent_median"):
+            median = instance.area_rent_median
+        else:
+            median = (
+                AreaRentStats.objects.filter(
+                    city=instance.city,
+                    area_name=instance.area_name,
+                    num_of_bedrooms=instance.num_of_bedrooms,
+                )
+                .values_list("rent_median", flat=True)
+                .first()
+            )
+        if not median:
+            return None
+        difference = instance.rent_per_month - median
+        return {
+            "area_median": float(median),
+            "difference": float(difference),
+            "difference_percent": round(float(difference / median * 100), 1),
+        }
 
     def get_total_per_month(self, instance):
         if instance.extra_bills is None:
@@ -346,24 +465,57 @@ class PlaceSerializer(serializers.ModelSerializer):
             "featured",
         ]
 
+    def validate_facilities(self, value):
+        # Comma separated facility ids, resolved with a single query
+        try:
+            facility_ids = {int(item) for item in value.split(",") if item.strip()}
+        except ValueError:
+            raise serializers.ValidationError("Facilities must be comma separated ids.")
+        found = set(
+            Facility.objects.filter(id__in=facility_ids).values_list("id", flat=True)
+        )
+        missing = facility_ids - found
+        if missing:
+            raise serializers.ValidationError(
+                f"Unknown facility ids: {', '.join(map(str, sorted(missing)))}."
+            )
+        return sorted(found)
+
     def create(self, validated_data):
         images_data = validated_data.pop("images", [])
-        # facilities_data = validated_data.pop("facilities", [])
-        facilities_data = list(validated_data.pop("facilities", []).split(","))
+        facility_ids = validated_data.pop("facilities", [])
         owner = self.context["request"].user
-        place = Place.objects.create(owner=owner, **validated_data)
-
-        while transaction.atomic():
-            for facility in facilities_data:
-                if facility == "":
-                    continue
-                facility_instance = Facility.objects.get(id=facility)
-                place.facilities.add(facility_instance)
-
-            for image_data in images_data:
-                Image.objects.create(place=place, **image_data)
 
-            return place
+        # Hashed and stored before the transaction, which only inserts rows
+        blobs = [ImageBlob.prepare(image_data["image"]) for image_data in images_data]
+        try:
+            with transaction.atomic():
+                place = Place.objects.create(owner=owner, **validated_data)
+
+                # A new place has no facilities yet, so insert the through rows directly
+                through = Place.facilities.through
+                through.objects.bulk_create(
+                    [
+                        through(place_id=place.pk, facility_id=facility_id)
+                        for facility_id in facility_ids
+                    ]
+                )
+                images = []
+                for image_data, blob in zip(images_data, blobs):
+                    image = Image(
+                        place=place, description=image_data.get("description")
+                    )
+                    image.use_blob(ImageBlob.acquire(blob))
+                    images.append(image)
+                Image.objects.bulk_create(images)
+                # Images sharing an existing blob already have its variants
+                Image.schedule_variants(
+                    [image.pk for image in images if not image.variants]
+                )
+        finally:
+            ImageBlob.discard_unused(blobs)
+
+        return place
 
 
 class PlaceUpdateSerializer(serializers.ModelSerializer):
@@ -422,3 +574,19 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
             instance.facilities.set(Facility.objects.filter(id__in=facilities_data))
 
         return instance
+
+
+class AreaRentStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AreaRentStats
+        fields = [
+            "city",
+            "area_name",
+            "num_of_bedrooms",
+            "listing_count",
+            "rent_p25",
+            "rent_median",
+            "rent_p75",
+            "mean_rent_per_sqft",
+            "refreshed_at",
+        ]
@@ -0,0 +1,147 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from place.bookmarks import invalidate_bookmarked_place_ids
+from place.configs import CacheGeneration, PlaceRating
+from place.images import delete_variants
+from place.models import (
+    Bookmark,
+    Category,
+    Facility,
+    Image,
+    ImageBlob,
+    Place,
+    PlaceReview,
+)
+from user.models import HostStats
+from utils.cache import bump_generation
+
+
+@receiver(post_delete, sender=PlaceReview)
+def remove_review_from_rating_summary(sender, instance, **kwargs):
+    # Runs inside the delete transaction, also for queryset and cascade deletes
+    Place.apply_rating_delta(
+        instance.place_id,
+        -1,
+        {field: -getattr(instance, field) for field in PlaceRating.FIELDS},
+    )
+
+
+@receiver(post_delete, sender=Place)
+def remove_place_from_host_stats(sender, instance, **kwargs):
+    HostStats.apply_hosted_places_delta(instance.owner_id, -1)
+
+
+@receiver(post_delete, sender=Place)
+def remove_place_from_featured_snapshot(sender, instance, **kwargs):
+    if instance.featured:
+        Place.schedule_featured_refresh()
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def touch_place_for_image(sender, instance, **kwargs):
+    Place.touch([instance.place_id])
+
+
+@receiver(m2m_changed, sender=Place.facilities.through)
+def touch_place_for_facilities(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        Place.touch([instance.pk])
+    elif pk_set:
+        Place.touch(pk_set)
+
+
+@receiver(m2m_changed, sender=Bookmark.places.through)
+def invalidate_bookmarked_ids(sender, instance, action, reverse, pk_set, **kwargs):
+    # pre_clear: the bookmarks of a place are only known before the clear
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_bookmarked_place_ids(instance.user_id)
+    else:
+        bookmarks = (
+            instance.bookmarks.all()
+            if action == "pre_clear"
+            else Bookmark.objects.filter(pk__in=pk_set)
+        )
+        invalidate_bookmarked_place_ids(*bookmarks.values_list("user_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Bookmark.places.through)
+def recount_place_bookmarks(sender, instance, action, reverse, pk_set, **kwargs):
+    # Bookmark edits through the ORM, e.g. the admin; the API keeps the
+    # counts itself in place.bookmarks.bookmark_place
+    if action == "pre_clear" and not reverse:
+        instance._cleared_place_ids = list(instance.places.values_list("id", flat=True))
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        Place.recount_bookmarks([instance.pk])
+    elif action == "post_clear":
+        Place.recount_bookmarks(instance._cleared_place_ids)
+    elif pk_set:
+        Place.recount_bookmarks(pk_set)
+
+
+@receiver(pre_delete, sender=Bookmark)
+def remember_bookmarked_places(sender, instance, **kwargs):
+    # The bookmark rows are gone by post_delete, e.g. when a user is deleted
+    instance._deleted_place_ids = list(instance.places.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Bookmark)
+def recount_deleted_bookmarks(sender, instance, **kwargs):
+    Place.recount_bookmarks(getattr(instance, "_deleted_place_ids", []))
+    invalidate_bookmarked_place_ids(instance.user_id)
+
+
+@receiver(pre_delete, sender=Place)
+def invalidate_bookmarked_ids_of_place(sender, instance, **kwargs):
+    # The cascade deletes the bookmark rows without m2m_changed
+    invalidate_bookmarked_place_ids(
+        *instance.bookmarks.values_list("user_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Place)
+@receiver(post_delete, sender=Place)
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+@receiver(post_save, sender=PlaceReview)
+@receiver(post_delete, sender=PlaceReview)
+@receiver(m2m_changed, sender=Place.facilities.through)
+def invalidate_place_caches(sender, **kwargs):
+    bump_generation(CacheGeneration.PLACES)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_caches(sender, **kwargs):
+    bump_generation(CacheGeneration.CATEGORIES, CacheGeneration.PLACES)
+
+
+@receiver(post_save, sender=Facility)
+@receiver(post_delete, sender=Facility)
+def invalidate_facility_caches(sender, **kwargs):
+    bump_generation(CacheGeneration.FACILITIES, CacheGeneration.PLACES)
+
+
+@receiver(post_save, sender=Image)
+def schedule_image_variants(sender, instance, created, **kwargs):
+    # Images sharing an existing blob already have its variants
+    if created and not instance.variants:
+        Image.schedule_variants([instance.pk])
+
+
+@receiver(post_delete, sender=Image)
+def remove_image_files(sender, instance, **kwargs):
+    if instance.blob_id:
+        # The blob removes the file and variants once nothing uses them
+        ImageBlob.release(instance.blob_id)
+    elif instance.variants:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: delete_variants(instance.variants, storage))
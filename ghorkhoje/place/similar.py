@@ -0,0 +1,286 @@
+import threading
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+import numpy as np
+
+from django.utils import timezone
+
+from place.configs import CacheGeneration, SimilarPlaces
+from place.models import Category, Facility, Place
+from utils.cache import get_generations
+
+PLACE_FIELDS = [
+    "id",
+    "is_available",
+    "category_id",
+    "rent_per_month",
+    "num_of_bedrooms",
+    "num_of_bathrooms",
+    "area_in_sqft",
+    "latitude",
+    "longitude",
+]
+
+# (feature, source field, log scaled, weight group)
+NUMERIC_FEATURES = [
+    ("rent", "rent_per_month", True, "rent"),
+    ("bedrooms", "num_of_bedrooms", False, "bedrooms"),
+    ("bathrooms", "num_of_bathrooms", False, "bathrooms"),
+    ("area", "area_in_sqft", True, "area"),
+    ("latitude", "latitude", False, "location"),
+    ("longitude", "longitude", False, "location"),
+]
+
+
+# Swapped as a whole so readers never mix arrays of different builds
+MatrixState = namedtuple("MatrixState", "ids matrix sq_norms available rows")
+
+
+def _column(rows, field):
+    # None becomes NaN and is imputed with the mean, i.e. 0 after scaling
+    return np.array([row[field] for row in rows], dtype=np.float64)
+
+
+class FeatureMatrix:
+    """
+    Feature vectors of all places in NumPy arrays, row aligned with `ids`:
+    z-scored rent, rooms, area and location, a category one-hot and a
+    facilities bitset, each column multiplied by the square root of its
+    weight so a plain squared euclidean distance is the weighted distance.
+
+    Built once per process, then changed places are re-encoded every
+    SYNC_INTERVAL seconds; a full rebuild every REBUILD_INTERVAL refreshes
+    the scaling and the category and facility columns.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built_at = None
+        self.checked_at = 0.0
+        self.synced_at = None
+        self.generation = None
+        self.state = None
+
+    # Encoding
+
+    def fit(self, rows):
+        """Scaling and one-hot column layout for a full set of rows."""
+        self.stats = {}
+        for name, field, log_scaled, _ in NUMERIC_FEATURES:
+            values = _column(rows, field)
+            if log_scaled:
+                values = np.log1p(np.clip(values, 0, None))
+            mean = np.nanmean(values) if np.isfinite(values).any() else 0.0
+            std = np.nanstd(values) if np.isfinite(values).any() else 0.0
+            self.stats[name] = (mean, std or 1.0)
+
+        weights = SimilarPlaces.WEIGHTS
+        self.categories = {
+            category_id: len(NUMERIC_FEATURES) + index
+            for index, category_id in enumerate(
+                Category.objects.order_by("id").values_list("id", flat=True)
+            )
+        }
+        offset = len(NUMERIC_FEATURES) + len(self.categories)
+        self.facilities = {
+            facility_id: offset + index
+            for index, facility_id in enumerate(
+                Facility.objects.order_by("id").values_list("id", flat=True)
+            )
+        }
+        self.width = offset + len(self.facilities)
+        self.category_value = np.sqrt(weights["category"])
+        self.facility_value = np.sqrt(weights["facility"])
+
+    def encode(self, rows, facility_pairs):
+        """Feature rows for `rows`, in order, given (place_id, facility_id) pairs."""
+        matrix = np.zeros((len(rows), self.width), dtype=np.float32)
+        for column, (name, field, log_scaled, group) in enumerate(NUMERIC_FEATURES):
+            values = _column(rows, field)
+            if log_scaled:
+                values = np.log1p(np.clip(values, 0, None))
+            mean, std = self.stats[name]
+            values = np.nan_to_num((values - mean) / std)
+            matrix[:, column] = values * np.sqrt(SimilarPlaces.WEIGHTS[group])
+
+        positions = {row["id"]: index for index, row in enumerate(rows)}
+        category_rows = [
+            (index, self.categories[row["category_id"]])
+            for index, row in enumerate(rows)
+            if row["category_id"] in self.categories
+        ]
+        if category_rows:
+            indexes, columns = zip(*category_rows)
+            matrix[list(indexes), list(columns)] = self.category_value
+
+        facility_cells = [
+            (positions[place_id], self.facilities[facility_id])
+            for place_id, facility_id in facility_pairs
+            if place_id in positions and facility_id in self.facilities
+        ]
+        if facility_cells:
+            indexes, columns = zip(*facility_cells)
+            matrix[list(indexes), list(columns)] = self.facility_value
+        return matrix
+
+    def needs_rebuild(self, rows, facility_pairs):
+        # Columns are fixed at build time, new categories or facilities need new ones
+        return any(
+            row["category_id"] is not None and row["category_id"] not in self.categories
+            for row in rows
+        ) or any(
+            facility_id not in self.facilities for _, facility_id in facility_pairs
+        )
+
+    # Building and syncing
+
+    def rebuild(self):
+        started = timezone.now()
+        rows = list(Place.objects.values(*PLACE_FIELDS))
+        pairs = list(
+            Place.facilities.through.objects.values_list("place_id", "facility_id")
+        )
+        self.fit(rows)
+        matrix = self.encode(rows, pairs)
+
+        ids = np.array([row["id"] for row in rows], dtype=np.int64)
+        self.state = MatrixState(
+            ids=ids,
+            matrix=matrix,
+            sq_norms=np.einsum("ij,ij->i", matrix, matrix),
+            available=np.array([row["is_available"] for row in rows], dtype=bool),
+            rows={place_id: index for index, place_id in enumerate(ids.tolist())},
+        )
+        self.built_at = time.monotonic()
+        self.synced_at = started
+
+    def apply_changes(self):
+        """Re-encode places updated since the last sync, appending new ones."""
+        started = timezone.now()
+        since = self.synced_at - timedelta(seconds=SimilarPlaces.SYNC_OVERLAP)
+        rows = list(Place.objects.filter(updated_at__gte=since).values(*PLACE_FIELDS))
+        if not rows:
+            self.synced_at = started
+            return
+        pairs = list(
+            Place.facilities.through.objects.filter(
+                place_id__in=[row["id"] for row in rows]
+            ).values_list("place_id", "facility_id")
+        )
+        if self.needs_rebuild(rows, pairs):
+            self.rebuild()
+            return
+
+        encoded = self.encode(rows, pairs)
+        sq_norms = np.einsum("ij,ij->i", encoded, encoded)
+        available = np.array([row["is_available"] for row in rows], dtype=bool)
+
+        # Changed rows are overwritten in place; a reader mid-query sees
+        # either version of a row, which is harmless
+        state = self.state
+        existing = [
+            (index, state.rows[row["id"]])
+            for index, row in enumerate(rows)
+            if row["id"] in state.rows
+        ]
+        if existing:
+            sources, targets = map(list, zip(*existing))
+            state.matrix[targets] = encoded[sources]
+            state.sq_norms[targets] = sq_norms[sources]
+            state.available[targets] = available[sources]
+
+        new = [index for index, row in enumerate(rows) if row["id"] not in state.rows]
+        if new:
+            ids = [rows[index]["id"] for index in new]
+            self.state = MatrixState(
+                ids=np.concatenate([state.ids, np.array(ids, dtype=np.int64)]),
+                matrix=np.vstack([state.matrix, encoded[new]]),
+                sq_norms=np.concatenate([state.sq_norms, sq_norms[new]]),
+                available=np.concatenate([state.available, available[new]]),
+                rows={
+                    **state.rows,
+                    **{
+                        place_id: len(state.ids) + offset
+                        for offset, place_id in enumerate(ids)
+                    },
+                },
+            )
+        self.synced_at = started
+
+    def refresh(self):
+        now = time.monotonic()
+        if (
+            self.built_at is not None
+            and now - self.checked_at < SimilarPlaces.SYNC_INTERVAL
+        ):
+            return
+        # One request refreshes, the others keep using the current arrays
+        if not self.lock.acquire(blocking=self.built_at is None):
+            return
+        try:
+            if self.built_at is not None and self.checked_at >= now:
+                return  # refreshed by the thread holding the lock before us
+            self.checked_at = time.monotonic()
+            if (
+                self.built_at is None
+                or now - self.built_at >= SimilarPlaces.REBUILD_INTERVAL
+            ):
+                self.rebuild()
+                return
+
+            try:
+                generation = get_generations(CacheGeneration.PLACES)[0]
+            except Exception:
+                traceback.print_exc()
+                generation = None
+            # Unchanged counter: no place was saved, skip the query
+            if generation is not None and generation == self.generation:
+                return
+            self.apply_changes()
+            self.generation = generation
+        finally:
+            self.lock.release()
+
+    # Queries
+
+    def neighbours(self, place_id, limit):
+        """
+        Ids of the `limit` available places nearest to `place_id`, nearest
+        first, or None when the place is not in the matrix.
+        """
+        state = self.state
+        row = state.rows.get(place_id) if state else None
+        if row is None:
+            return None
+
+        distances = state.sq_norms - 2 * (state.matrix @ state.matrix[row])
+        distances += state.sq_norms[row]
+        distances[~state.available] = np.inf
+        distances[row] = np.inf
+
+        limit = min(limit, len(state.ids) - 1)
+        if limit <= 0:
+            return []
+        nearest = np.argpartition(distances, limit - 1)[:limit]
+        nearest = nearest[np.argsort(distances[nearest])]
+        nearest = nearest[np.isfinite(distances[nearest])]
+        return state.ids[nearest].tolist()
+
+
+feature_matrix = FeatureMatrix()
+
+
+def similar_place_ids(place_id, limit):
+    """
+    Ids of available places similar to `place_id`, nearest first. A few
+    extra are returned to make up for places deleted since the last
+    rebuild, so callers should load them and keep the first `limit`.
+    """
+    feature_matrix.refresh()
+    return (
+        feature_matrix.neighbours(place_id, limit + SimilarPlaces.CANDIDATE_MARGIN)
+        or []
+    )
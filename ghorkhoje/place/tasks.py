@@ -0,0 +1,53 @@
+from celery import shared_task
+
+from django.db import transaction
+
+from place.configs import CacheGeneration
+from place.featured import build_featured_snapshot
+from place.images import generate_variants
+from place.models import AreaRentStats, Image, ImageBlob, Place
+from utils.cache import bump_generation
+
+
+@shared_task(ignore_result=True)
+def refresh_featured_places():
+    snapshot = build_featured_snapshot()
+    print(f"[{snapshot['generated_at']}] Featured snapshot refreshed")
+
+
+@shared_task(ignore_result=True)
+def refresh_area_rent_stats():
+    groups = AreaRentStats.refresh()
+    bump_generation(CacheGeneration.RENT_STATS)
+    print(f"Area rent stats refreshed for {groups} groups")
+
+
+@shared_task(ignore_result=True)
+def generate_image_variants(image_id):
+    image = Image.objects.filter(pk=image_id).first()
+    if image is None:
+        return
+
+    if image.blob_id is None:
+        variants = generate_variants(image)
+        images = Image.objects.filter(pk=image_id)
+    else:
+        with transaction.atomic():
+            # Locked so images sharing the blob render its variants once
+            blob = (
+                ImageBlob.objects.select_for_update().filter(pk=image.blob_id).first()
+            )
+            if blob is None:
+                return
+            variants = blob.variants or generate_variants(image)
+            ImageBlob.objects.filter(pk=blob.pk).update(variants=variants)
+        images = Image.objects.filter(blob_id=blob.pk)
+
+    place_ids = set(images.values_list("place_id", flat=True))
+    images.update(variants=variants)
+
+    # Cards and detail payloads now point at the variants
+    Place.touch(place_ids)
+    bump_generation(CacheGeneration.PLACES)
+    if Place.objects.filter(pk__in=place_ids, featured=True).exists():
+        Place.schedule_featured_refresh()
@@ -1,3 +1,685 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import skipUnless
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from PIL import Image as PillowImage
+from rest_framework.request import Request
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils.text import slugify
+from django.utils.timezone import now, timedelta
+
+from place.bookmarks import bookmark_place, bookmarked_place_ids
+from place.configs import PlaceRating, ReviewListing
+from place.filters import filter_places, normalize_filter_params, rank_by_relevance
+from place.geo import bounding_box, clamp_geohash_precision
+from place.images import generate_variants
+from place.importer import PlaceImporter
+from place.models import (
+    Bookmark,
+    Category,
+    Facility,
+    Image,
+    ImageBlob,
+    Place,
+    PlaceReview,
+)
+from place.views import StandardResultsSetPagination
+from user.models import Review, User
+from utils.functions import allocate_unique_slugs, next_available_slug
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def explain(queryset):
+    # Tiny test tables are always cheapest to scan, so make the planner
+    # show which index it would use on a real table
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@skipUnless(connection.vendor == "postgresql", "Uses PostgreSQL EXPLAIN output")
+class PlaceListFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="host@example.com", full_name="Host")
+        cls.wifi = Facility.objects.create(name="Wifi")
+        cls.lift = Facility.objects.create(name="Lift")
+
+        for index in range(12):
+            place = Place.objects.create(
+                title=f"Flat {index}",
+                owner=cls.owner,
+                city="Dhaka" if index % 2 else "Chattogram",
+                area_name="Dhanmondi" if index % 3 else "Gulshan",
+                rent_per_month=5000 + index * 1000,
+                latitude=23.7,
+                longitude=90.4,
+                num_of_bedrooms=index % 6 + 1,
+                num_of_parking_spaces=index % 2,
+                capacity=index % 4 + 1,
+            )
+            if index % 2:
+                place.facilities.add(cls.wifi)
+            if index % 4 == 1:
+                place.facilities.add(cls.lift)
+
+    def filter(self, query):
+        return filter_places(Place.objects.filter(is_available=True), QueryDict(query))
+
+    def test_room_counts(self):
+        self.assertEqual(self.filter("bedrooms=2").count(), 2)
+        self.assertEqual(self.filter("bedrooms=5%2B").count(), 4)
+
+    def test_params_are_read_as_the_cache_key_normalizes_them(self):
+        Place.objects.filter(num_of_bedrooms=1).update(
+            category=Category.objects.create(name="Apartment")
+        )
+        for query in ("category=apartment", "category=%20apartment%20"):
+            self.assertEqual(self.filter(query).count(), 2)
+        self.assertEqual(
+            normalize_filter_params(QueryDict("category=%20apartment%20")),
+            [("category", "apartment")],
+        )
+        Place.objects.filter(num_of_bedrooms=2).update(
+            created_at=now() - timedelta(days=10)
+        )
+        self.assertEqual(self.filter("date_range=%20last_7_days").count(), 10)
+
+    def test_facilities_all_of(self):
+        self.assertEqual(self.filter("facilities=wifi").count(), 6)
+        self.assertEqual(self.filter("facilities=wifi,lift").count(), 3)
+        self.assertEqual(self.filter("facilities=wifi&facilities=unknown").count(), 0)
+
+    def test_parking_and_capacity(self):
+        self.assertEqual(self.filter("parking=true").count(), 6)
+        self.assertEqual(self.filter("capacity=4").count(), 3)
+
+    def test_search_tolerates_typos_in_long_titles(self):
+        place = Place.objects.get(title="Flat 1")
+        Place.objects.filter(pk=place.pk).update(title="Room for rent in Mirpur")
+        Place.refresh_search_vectors(Place.objects.filter(pk=place.pk))
+        self.assertEqual(list(self.filter("search=mirpr")), [place])
+        # Substrings still match
+        self.assertEqual(list(self.filter("search=mirp")), [place])
+        ranked = rank_by_relevance(
+            self.filter("search=mirpr"), QueryDict("search=mirpr")
+        )
+        self.assertEqual(list(ranked), [place])
+
+    def test_invalid_values_raise(self):
+        with self.assertRaises(ValueError):
+            self.filter("bedrooms=two")
+        with self.assertRaises(ValueError):
+            self.filter("available_from=tomorrow")
+
+    def test_search_uses_indexes(self):
+        plan = explain(self.filter("search=flat"))
+        self.assertIn("places_search_vector_gin", plan)
+        self.assertIn("places_title_upper_trgm_gin", plan)
+        self.assertIn("places_desc_upper_trgm_gin", plan)
+        self.assertIn("places_title_trgm_gin", plan)
+
+    def test_city_rent_uses_index(self):
+        plan = explain(self.filter("city=Dhaka&min_rent=6000&max_rent=12000"))
+        self.assertIn("places_listed_city_rent_idx", plan)
+
+    def test_city_area_uses_index(self):
+        plan = explain(self.filter("city=Dhaka&area_name=Gulshan"))
+        self.assertIn("places_listed_area_rent_idx", plan)
+
+    def test_bedrooms_rent_uses_index(self):
+        plan = explain(self.filter("bedrooms=3&max_rent=10000"))
+        self.assertIn("places_listed_bedrooms_idx", plan)
+
+
+@skipUnless(connection.vendor == "postgresql", "Place.save uses full text search")
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlaceDetailsQueryTests(TestCase):
+    # Version lookup for the ETag, the place with owner, host stats and
+    # category, then facilities, images, reviews and host reviews
+    QUERY_BUDGET = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="host@example.com", full_name="Host")
+        cls.place = Place.objects.create(
+            title="Flat",
+            owner=cls.owner,
+            category=Category.objects.create(name="Apartment"),
+            city="Dhaka",
+            area_name="Gulshan",
+            rent_per_month=15000,
+            latitude=23.7,
+            longitude=90.4,
+        )
+        cls.place.facilities.add(
+            Facility.objects.create(name="Wifi"), Facility.objects.create(name="Lift")
+        )
+        cls.add_reviews_and_images(3)
+
+    @classmethod
+    def add_reviews_and_images(cls, count):
+        start = User.objects.count()
+        for index in range(start, start + count):
+            reviewer = User.objects.create_user(
+                email=f"guest{index}@example.com", full_name=f"Guest {index}"
+            )
+            PlaceReview.objects.create(place=cls.place, reviewer=reviewer)
+            Review.objects.create(reviewer=reviewer, reviewee=cls.owner)
+            Image.objects.bulk_create(
+                [Image(place=cls.place, image=f"places/{index}.jpg")]
+            )
+
+    def get_details(self):
+        response = self.client.get(f"/api/v1/places/{self.place.slug}/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def test_query_budget(self):
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            data = self.get_details()
+        self.assertEqual(len(data["reviews"]), 3)
+        self.assertEqual(len(data["owner"]["reviews"]), 3)
+        self.assertEqual(len(data["images"]), 3)
+        self.assertEqual(len(data["facilities"]), 2)
+
+    def test_etag_follows_category_renames(self):
+        response = self.client.get(f"/api/v1/places/{self.place.slug}/")
+        self.assertNotIn("Last-Modified", response)
+
+        self.place.category.name = "Flat"
+        self.place.category.save()
+        response = self.client.get(
+            f"/api/v1/places/{self.place.slug}/",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_budget_does_not_grow_with_reviews(self):
+        self.add_reviews_and_images(5)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            data = self.get_details()
+        # Only the latest reviews are embedded
+        self.assertEqual(len(data["reviews"]), ReviewListing.LATEST_COUNT)
+        self.assertEqual(data["review_count"], 8)
+        self.assertEqual(len(data["owner"]["reviews"]), ReviewListing.LATEST_COUNT)
+        self.assertEqual(data["owner"]["review_count"], 8)
+
+
+@skipUnless(connection.vendor == "postgresql", "Uses PostgreSQL data modifying CTEs")
+@override_settings(CACHES=LOCMEM_CACHES)
+class BookmarkPlaceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email="host@example.com", full_name="Host")
+        cls.guest = User.objects.create_user(
+            email="guest@example.com", full_name="Guest"
+        )
+        cls.place = Place.objects.create(
+            title="Flat",
+            owner=cls.owner,
+            city="Dhaka",
+            area_name="Gulshan",
+            rent_per_month=15000,
+            latitude=23.7,
+            longitude=90.4,
+        )
+
+    def bookmark_count(self):
+        self.place.refresh_from_db(fields=["bookmark_count"])
+        return self.place.bookmark_count
+
+    def test_add_and_remove_are_idempotent(self):
+        # The cached ids are dropped on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                result = bookmark_place(self.guest.pk, self.place.slug, "add")
+                self.assertTrue(result.bookmarked)
+                self.assertEqual(result.bookmark_count, 1)
+        self.assertEqual(self.bookmark_count(), 1)
+        self.assertEqual(bookmarked_place_ids(self.guest.pk), {self.place.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(2):
+                result = bookmark_place(self.guest.pk, self.place.slug, "remove")
+                self.assertFalse(result.bookmarked)
+                self.assertEqual(result.bookmark_count, 0)
+        self.assertEqual(self.bookmark_count(), 0)
+        self.assertEqual(bookmarked_place_ids(self.guest.pk), set())
+
+    def test_toggle(self):
+        with self.assertNumQueries(1):
+            result = bookmark_place(self.guest.pk, self.place.slug, "toggle")
+        self.assertTrue(result.bookmarked)
+        self.assertTrue(Bookmark.objects.filter(user=self.guest).exists())
+
+        result = bookmark_place(self.guest.pk, self.place.slug, "toggle")
+        self.assertFalse(result.bookmarked)
+        self.assertEqual(self.bookmark_count(), 0)
+
+    def test_deleting_a_place_drops_cached_ids(self):
+        bookmark_place(self.guest.pk, self.place.slug, "add")
+        self.assertEqual(bookmarked_place_ids(self.guest.pk), {self.place.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place.delete()
+        self.assertEqual(bookmarked_place_ids(self.guest.pk), set())
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale = Place.objects.get(pk=self.place.pk)
+        bookmark_place(self.guest.pk, self.place.slug, "add")
+        PlaceReview.objects.create(place=self.place, reviewer=self.guest, cleanliness=3)
+
+        stale.title = "Renamed flat"
+        stale.save()
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.title, "Renamed flat")
+        self.assertEqual(self.place.bookmark_count, 1)
+        self.assertEqual(self.place.review_count, 1)
+        self.assertEqual(self.place.cleanliness_rating_sum, 3)
+
+    def test_own_and_missing_places(self):
+        result = bookmark_place(self.owner.pk, self.place.slug, "add")
+        self.assertTrue(result.own_place)
+        self.assertFalse(result.changed)
+        self.assertEqual(self.bookmark_count(), 0)
+        self.assertIsNone(bookmark_place(self.guest.pk, "missing", "toggle"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlaceRatingSummaryTests(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(email="host@example.com", full_name="Host")
+        self.guest = User.objects.create_user(
+            email="guest@example.com", full_name="Guest"
+        )
+        # bulk_create skips Place.save, which needs PostgreSQL full text search
+        self.place, self.other = Place.objects.bulk_create(
+            [
+                Place(
+                    title=title,
+                    slug=slugify(title),
+                    owner=owner,
+                    city="Dhaka",
+                    area_name="Gulshan",
+                    rent_per_month=15000,
+                    latitude=23.7,
+                    longitude=90.4,
+                )
+                for title in ("Flat", "Other flat")
+            ]
+        )
+
+    def review(self, place, rating):
+        ratings = {field: rating for field in PlaceRating.FIELDS if field != "overall"}
+        return PlaceReview.objects.create(place=place, reviewer=self.guest, **ratings)
+
+    def summary(self, place):
+        place.refresh_from_db()
+        return (
+            place.review_count,
+            place.cleanliness_rating_sum,
+            place.cleanliness_rating_avg,
+            place.overall_rating_sum,
+        )
+
+    def test_create_edit_move_and_delete(self):
+        review = self.review(self.place, 4)
+        self.review(self.place, 2)
+        self.assertEqual(self.summary(self.place), (2, 6, 3.0, 6))
+
+        review.cleanliness = 5
+        review.save()
+        # overall is the floor of the mean of four ratings: (5 + 4 * 3) // 4
+        self.assertEqual(self.summary(self.place), (2, 7, 3.5, 6))
+
+        review.place = self.other
+        review.save()
+        self.assertEqual(self.summary(self.place), (1, 2, 2.0, 2))
+        self.assertEqual(self.summary(self.other), (1, 5, 5.0, 4))
+
+        review.delete()
+        self.assertEqual(self.summary(self.other), (0, 0, 0.0, 0))
+        # The rebuild from place_reviews agrees with the maintained summary
+        self.assertEqual(Place.rebuild_rating_summaries(), 1)
+        self.assertEqual(self.summary(self.place), (1, 2, 2.0, 2))
+
+
+class SlugAllocationTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            email="host@example.com", full_name="Host"
+        )
+
+    def add_places(self, *slugs):
+        # bulk_create skips Place.save, which needs PostgreSQL full text search
+        Place.objects.bulk_create(
+            [
+                Place(
+                    title=slug,
+                    slug=slug,
+                    owner=self.owner,
+                    city="Dhaka",
+                    area_name="Gulshan",
+                    rent_per_month=15000,
+                    latitude=23.7,
+                    longitude=90.4,
+                )
+                for slug in slugs
+            ]
+        )
+
+    def test_next_available_slug(self):
+        self.assertEqual(next_available_slug(Place, "flat"), "flat")
+        self.add_places("flat", "flat-3", "flat-room", "flat-2-1")
+        # After the highest suffix; other bases sharing the prefix are ignored
+        self.assertEqual(next_available_slug(Place, "flat"), "flat-4")
+        self.assertEqual(next_available_slug(Place, "flat-2"), "flat-2-2")
+        self.assertEqual(next_available_slug(Place, "flat-3"), "flat-3-1")
+
+    def test_allocate_unique_slugs(self):
+        self.add_places("room")
+        slugs = allocate_unique_slugs(
+            Place, ["flat", "flat", "flat", "flat-2", "room", "room"]
+        )
+        self.assertEqual(
+            slugs, ["flat", "flat-1", "flat-2", "flat-2-1", "room-1", "room-2"]
+        )
+
+    def test_allocated_slugs_are_unique_in_the_batch(self):
+        self.add_places("flat", "flat-1")
+        slugs = allocate_unique_slugs(Place, ["flat-3", "flat", "flat", "flat-3"])
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertFalse(Place.objects.filter(slug__in=slugs).exists())
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user(email="host@example.com", full_name="Host")
+        start = now()
+        # Duplicate rents and dates, so pages split runs of equal values
+        cls.places = Place.objects.bulk_create(
+            [
+                Place(
+                    title=f"Flat {index}",
+                    slug=f"flat-{index}",
+                    owner=owner,
+                    city="Dhaka",
+                    area_name="Gulshan",
+                    rent_per_month=Decimal("1000.50") * (index // 3),
+                    latitude=23.7,
+                    longitude=90.4,
+                )
+                for index in range(8)
+            ]
+        )
+        for place in cls.places:
+            Place.objects.filter(pk=place.pk).update(
+                created_at=start - timedelta(days=place.pk % 3)
+            )
+
+    def paginate(self, queryset, **params):
+        paginator = StandardResultsSetPagination()
+        request = Request(RequestFactory().get("/", {"cursor": "", **params}))
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, page
+
+    def walk(self, queryset, page_size=3):
+        ids = []
+        cursor = ""
+        while cursor is not None:
+            paginator, page = self.paginate(
+                queryset, cursor=cursor, page_size=page_size
+            )
+            ids += [place.pk for place in page]
+            link = paginator.get_next_cursor_link()
+            cursor = QueryDict(urlsplit(link).query)["cursor"] if link else None
+        return ids
+
+    def test_round_trips_keep_every_row_once(self):
+        for ordering in (
+            ["-created_at"],
+            ["rent_per_month"],
+            ["-rent_per_month", "created_at"],
+            ["created_at", "-rent_per_month", "-id"],
+        ):
+            queryset = Place.objects.order_by(*ordering)
+            # Remaining ties are broken by id, in the first field's direction
+            tie_break = (
+                [] if "-id" in ordering else ["-id" if ordering[0][0] == "-" else "id"]
+            )
+            expected = list(
+                queryset.order_by(*ordering, *tie_break).values_list("pk", flat=True)
+            )
+            for page_size in (1, 2, 3):
+                self.assertEqual(self.walk(queryset, page_size), expected, ordering)
+
+    def test_invalid_cursor(self):
+        for cursor in ("not base64!", "WzFd", "eyJhIjoxfQ=="):
+            with self.assertRaisesMessage(ValueError, "Invalid cursor."):
+                self.paginate(Place.objects.order_by("-created_at"), cursor=cursor)
+
+    def test_with_count(self):
+        paginator, page = self.paginate(
+            Place.objects.order_by("rent_per_month"), page_size=3, with_count="true"
+        )
+        self.assertEqual((paginator.count, len(page)), (8, 3))
+        paginator, _ = self.paginate(Place.objects.order_by("rent_per_month"))
+        self.assertIsNone(paginator.count)
+
+    def test_unsupported_orderings(self):
+        for ordering in (["owner__email"], ["?"]):
+            with self.assertRaises(ValueError):
+                self.paginate(Place.objects.order_by(*ordering))
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    PillowImage.new("RGB", (16, 16), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, MEDIA_CDN_URL="")
+class ImageBlobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, media_root, True)
+
+        self.owner = User.objects.create_user(
+            email="host@example.com", full_name="Host"
+        )
+        # bulk_create skips Place.save, which needs PostgreSQL full text search
+        (self.place,) = Place.objects.bulk_create(
+            [
+                Place(
+                    title="Flat",
+                    slug="flat",
+                    owner=self.owner,
+                    city="Dhaka",
+                    area_name="Gulshan",
+                    rent_per_month=15000,
+                    latitude=23.7,
+                    longitude=90.4,
+                )
+            ]
+        )
+
+    def add_image(self, content):
+        return Image.objects.create(
+            place=self.place, image=SimpleUploadedFile("photo.png", content)
+        )
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.add_image(png_bytes("red"))
+        second = self.add_image(png_bytes("red"))
+        other = self.add_image(png_bytes("blue"))
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertNotEqual(first.blob_id, other.blob_id)
+        self.assertEqual(ImageBlob.objects.get(pk=first.blob_id).ref_count, 2)
+        self.assertEqual(len(default_storage.listdir("places")[1]), 2)
+
+    def test_release_deletes_the_last_reference(self):
+        first = self.add_image(png_bytes("red"))
+        second = self.add_image(png_bytes("red"))
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(ImageBlob.objects.get(pk=second.blob_id).ref_count, 1)
+        self.assertTrue(default_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_release_adopts_images_without_blob(self):
+        image = self.add_image(png_bytes("red"))
+        # e.g. an imported row naming the same stored file
+        (imported,) = Image.objects.bulk_create(
+            [Image(place=self.place, image=image.image.name)]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+        imported.refresh_from_db()
+        self.assertEqual(imported.blob_id, image.blob_id)
+        self.assertEqual(ImageBlob.objects.get(pk=image.blob_id).ref_count, 1)
+        self.assertTrue(default_storage.exists(imported.image.name))
+
+    def test_rolled_back_blob_file_is_deleted(self):
+        blob = ImageBlob.prepare(SimpleUploadedFile("photo.png", png_bytes("red")))
+        self.assertTrue(default_storage.exists(blob.file.name))
+        try:
+            with transaction.atomic():
+                ImageBlob.acquire(blob)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        finally:
+            ImageBlob.discard_unused([blob])
+        self.assertFalse(ImageBlob.objects.exists())
+        self.assertFalse(default_storage.exists(blob.file.name))
+
+    def test_stored_original_has_no_metadata(self):
+        exif = PillowImage.Exif()
+        exif[0x010F] = "Camera"
+        buffer = io.BytesIO()
+        PillowImage.new("RGB", (16, 16), "red").save(
+            buffer, "JPEG", exif=exif.tobytes()
+        )
+
+        image = Image.objects.create(
+            place=self.place,
+            image=SimpleUploadedFile("photo.jpg", buffer.getvalue()),
+        )
+        with image.image.open("rb") as stored:
+            self.assertNotIn("exif", PillowImage.open(stored).info)
+
+    def test_variants_flatten_transparency_onto_white(self):
+        buffer = io.BytesIO()
+        PillowImage.new("RGBA", (16, 16), (0, 0, 0, 0)).save(buffer, "PNG")
+        image = self.add_image(buffer.getvalue())
+
+        variants = generate_variants(image)
+        with default_storage.open(variants["card"]["jpeg"]) as stored:
+            self.assertGreater(min(PillowImage.open(stored).getpixel((8, 8))), 250)
+
+    def test_images_sharing_a_file_get_their_own_variants(self):
+        name = default_storage.save("places/shared.png", io.BytesIO(png_bytes("red")))
+        first, second = Image.objects.bulk_create(
+            [Image(place=self.place, image=name), Image(place=self.place, image=name)]
+        )
+
+        first_variants = generate_variants(first)
+        second_variants = generate_variants(second)
+        self.assertNotEqual(
+            first_variants["card"]["jpeg"], second_variants["card"]["jpeg"]
+        )
+        self.assertTrue(default_storage.exists(first_variants["card"]["jpeg"]))
+
+    def test_importer_accepts_only_own_images_and_urls(self):
+        image = self.add_image(png_bytes("red"))
+        stranger = User.objects.create_user(
+            email="other@example.com", full_name="Other"
+        )
+        missing = "places/missing.png"
+        Image.objects.bulk_create([Image(place=self.place, image=missing)])
+
+        importer = PlaceImporter(self.owner)
+        self.assertIsNone(importer.check_image(image.image.name))
+        self.assertIsNone(importer.check_image("https://cdn.example.com/a.jpg?w=1"))
+        self.assertIn("does not exist", importer.check_image(missing))
+        self.assertIn("jpg", importer.check_image("https://cdn.example.com/a"))
+        self.assertIn(
+            "not one of your",
+            PlaceImporter(stranger).check_image(image.image.name),
+        )
+
+    def test_link_image_blobs(self):
+        first = default_storage.save("places/first.png", io.BytesIO(png_bytes("red")))
+        copy = default_storage.save("places/copy.png", io.BytesIO(png_bytes("red")))
+        Image.objects.bulk_create(
+            [
+                Image(place=self.place, image=first),
+                Image(place=self.place, image=first),
+                Image(place=self.place, image=copy),
+            ]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("link_image_blobs", stdout=io.StringIO())
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.ref_count, 3)
+        self.assertFalse(Image.objects.filter(blob__isnull=True).exists())
+        self.assertEqual(
+            set(Image.objects.values_list("image", flat=True)), {blob.file.name}
+        )
+        # The duplicate's file is gone, the shared one is kept
+        self.assertEqual(len(default_storage.listdir("places")[1]), 1)
+
+
+class ClusterPrecisionTests(SimpleTestCase):
+    def test_wide_boxes_get_coarser_cells(self):
+        self.assertEqual(clamp_geohash_precision(8, 0.01, 0.01), 7)
+        self.assertEqual(clamp_geohash_precision(8, 10, 10), 3)
+        # The whole world at the highest zoom is a few dozen cells
+        self.assertEqual(clamp_geohash_precision(8, 180, 360), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PlaceNearbyTests(TestCase):
+    def nearby(self, query):
+        return self.client.get(f"/api/v1/places/nearby/?{query}")
+
+    def test_rejects_non_finite_and_out_of_range_values(self):
+        for query in (
+            "lat=23.7&lng=90.4&radius=nan",
+            "lat=inf&lng=90.4",
+            "lat=91&lng=90.4",
+            "lat=23.7&lng=-181",
+        ):
+            self.assertEqual(self.nearby(query).status_code, 400, query)
+
+    def test_poles(self):
+        for latitude in (90, -90):
+            self.assertEqual(self.nearby(f"lat={latitude}&lng=0").status_code, 200)
+        self.assertEqual(bounding_box(89.99, 10, 5)[2:], (-180, 180))
@@ -4,7 +4,12 @@ from place.views import *
 
 place_urlpatterns = [
     path("create/", PlaceAPIView.as_view(), name="place"),
+    path("import/", PlaceImportAPIView.as_view(), name="place_import"),
     path("list/", PlaceListAPIView.as_view(), name="place_list"),
+    path("facets/", PlaceFacetsAPIView.as_view(), name="place_facets"),
+    path("nearby/", PlaceNearbyAPIView.as_view(), name="place_nearby"),
+    path("rent-stats/", AreaRentStatsAPIView.as_view(), name="area_rent_stats"),
+    path("map-clusters/", PlaceMapClusterAPIView.as_view(), name="place_map_clusters"),
     path("categories/", CategoryAPIView.as_view(), name="category"),
     path("facilities/", FacilityAPIView.as_view(), name="facility"),
     path(
@@ -21,6 +26,15 @@ place_urlpatterns = [
         name="image_delete",
     ),
     path("<str:slug>/", PlaceDetailsAPIView.as_view(), name="place_detail"),
+    path(
+        "<str:slug>/reviews/", PlaceReviewListAPIView.as_view(), name="place_reviews"
+    ),
+    path(
+        "<str:slug>/similar/", PlaceSimilarAPIView.as_view(), name="place_similar"
+    ),
+    path(
+        "<str:slug>/bookmark/", PlaceBookmarkAPIView.as_view(), name="place_bookmark"
+    ),
     path(
         "toggle-bookmark/<str:slug>/",
         ToggleBookmarkPlaceAPIView.as_view(),
@@ -1,29 +1,67 @@
 import traceback
+from math import isfinite
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import PageNumberPagination
 
-from django.db.models import Q, Prefetch
+from django.core.cache import cache
+from django.db.models import Q, Prefetch, Avg, Count, Max, Min
+from django.db.models.functions import Substr
+from django.utils.decorators import method_decorator
 from django.utils.timezone import now, timedelta
+from django.views.decorators.http import condition
 
 from place.models import *
 from place.serializer import *
+from place.filters import filter_places, rank_by_relevance
+from place.conditional import (
+    category_list_etag,
+    facility_list_etag,
+    place_detail_etag,
+)
+from place.featured import current_rotation, get_featured_snapshot, rotate
+from place.importer import PlaceImporter, detect_format, read_rows
+from place.bookmarks import bookmark_place, request_bookmarked_place_ids
+from place.similar import similar_place_ids
+from place.facets import facet_counts, facets_cache_key
+from place.configs import (
+    CacheGeneration,
+    FeaturedPlaces,
+    PlaceFacets,
+    ReviewListing,
+    SimilarPlaces,
+)
+from place.geo import (
+    bounding_box,
+    clamp_geohash_precision,
+    haversine_distance,
+    geohash_precision_for_zoom,
+)
 from user.models import Notification
+from utils.media import absolute_url
 from utils.responses import common_response
+from utils.pagination import KeysetPaginationMixin
+from utils.cache import cache_anonymous_response
 
 
-class StandardResultsSetPagination(PageNumberPagination):
+class StandardResultsSetPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
+class ReviewPagination(StandardResultsSetPagination):
+    keyset_by_default = True
+
+
 class FacilityAPIView(APIView):
     permission_classes = [AllowAny]
     serializer_class = FacilitySerializer
 
+    @method_decorator(condition(etag_func=facility_list_etag))
+    @cache_anonymous_response("facilities", [CacheGeneration.FACILITIES])
     def get(self, request):
         try:
             facilities = Facility.objects.all().order_by("name")
@@ -43,6 +81,8 @@ class CategoryAPIView(APIView):
     permission_classes = [AllowAny]
     serializer_class = CategorySerializer
 
+    @method_decorator(condition(etag_func=category_list_etag))
+    @cache_anonymous_response("categories", [CacheGeneration.CATEGORIES])
     def get(self, request):
         try:
             categories = Category.objects.all().order_by("name")
@@ -93,55 +133,43 @@ class PlaceListAPIView(APIView):
     serializer_class = PlaceListSerializer
     pagination_class = StandardResultsSetPagination
 
+    @cache_anonymous_response(
+        "place_list",
+        [
+            CacheGeneration.PLACES,
+            CacheGeneration.CATEGORIES,
+            CacheGeneration.FACILITIES,
+        ],
+    )
     def get(self, request):
         try:
-            category_slug = request.query_params.get("category", "all")
-            search_query = request.query_params.get("search", "").strip().lower()
-            date_range = request.query_params.get(
-                "date_range", None
-            )  # 'last_7_days', 'last_30_days', 'all'
+            sort_by = request.query_params.get("sort_by")  # 'relevance' / 'popular'
             sort_by_price = request.query_params.get(
                 "sort_by_price", "created_at"
             )  # 'low_to_high' / 'high_to_low'
 
-            # Get Category
-            category = (
-                Category.objects.filter(slug=category_slug).first()
-                if category_slug != "all"
-                else None
-            )
-
             # Base queryset
             places = (
                 Place.objects.select_related("owner")
                 .prefetch_related(
                     Prefetch(
                         "images",
-                        queryset=Image.objects.only("id", "image")[:1],
+                        queryset=Image.objects.only("id", "place", "image", "variants")[
+                            :1
+                        ],
                         to_attr="first_image",
                     ),
                 )
                 .filter(is_available=True)
             )
-            if category:
-                places = places.filter(category=category)
-
-            # Filter: Search
-            if search_query:
-                places = places.filter(
-                    Q(title__icontains=search_query)
-                    | Q(description__icontains=search_query)
-                )
-
-            # Filter: Date Range
-            if date_range == "last_7_days":
-                places = places.filter(created_at__gte=now() - timedelta(days=7))
-            elif date_range == "last_30_days":
-                places = places.filter(created_at__gte=now() - timedelta(days=30))
-            # else 'all' means no filter
+            places = filter_places(places, request.query_params)
 
             # Sorting
-            if sort_by_price == "low_to_high":
+            if sort_by == "relevance" and request.query_params.get("search"):
+                places = rank_by_relevance(places, request.query_params)
+            elif sort_by == "popular":
+                places = places.order_by("-bookmark_count", "-id")
+            elif sort_by_price == "low_to_high":
                 places = places.order_by("rent_per_month")
             elif sort_by_price == "high_to_low":
                 places = places.order_by("-rent_per_month")
@@ -161,6 +189,200 @@ class PlaceListAPIView(APIView):
             return common_response(400, str(e))
 
 
+class PlaceFacetsAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            cache_key = facets_cache_key(request.query_params)
+            facets = cache.get(cache_key)
+            if facets is None:
+                places = filter_places(
+                    Place.objects.filter(is_available=True), request.query_params
+                )
+                facets = facet_counts(places)
+                cache.set(cache_key, facets, PlaceFacets.CACHE_TTL)
+
+            return common_response(200, "Facets fetched successfully.", facets)
+
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class AreaRentStatsAPIView(APIView):
+    permission_classes = [AllowAny]
+    serializer_class = AreaRentStatsSerializer
+    pagination_class = StandardResultsSetPagination
+
+    @cache_anonymous_response("rent_stats", [CacheGeneration.RENT_STATS])
+    def get(self, request):
+        try:
+            stats = AreaRentStats.objects.all()
+            city = request.query_params.get("city")
+            if city:
+                stats = stats.filter(city=city)
+            area_name = request.query_params.get("area_name")
+            if area_name:
+                stats = stats.filter(area_name=area_name)
+            bedrooms = request.query_params.get("bedrooms")
+            if bedrooms:
+                try:
+                    stats = stats.filter(num_of_bedrooms=int(bedrooms))
+                except ValueError:
+                    return common_response(400, "'bedrooms' must be a number.")
+
+            paginator = self.pagination_class()
+            paginated_stats = paginator.paginate_queryset(
+                stats.order_by("city", "area_name", "num_of_bedrooms"), request
+            )
+            serializer = self.serializer_class(paginated_stats, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class PlaceNearbyAPIView(APIView):
+    permission_classes = [AllowAny]
+    serializer_class = PlaceNearbySerializer
+    pagination_class = StandardResultsSetPagination
+
+    DEFAULT_RADIUS_KM = 5
+    MAX_RADIUS_KM = 50
+
+    def get(self, request):
+        try:
+            try:
+                latitude = float(request.query_params["lat"])
+                longitude = float(request.query_params["lng"])
+                radius = float(
+                    request.query_params.get("radius", self.DEFAULT_RADIUS_KM)
+                )
+            except (KeyError, ValueError):
+                return common_response(
+                    400, "'lat' and 'lng' are required and must be numbers."
+                )
+            # float() accepts 'nan' and 'inf', which no range check rejects
+            if not all(isfinite(value) for value in (latitude, longitude, radius)):
+                return common_response(
+                    400, "'lat', 'lng' and 'radius' must be finite numbers."
+                )
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                return common_response(
+                    400, "'lat' must be between -90 and 90 and 'lng' between -180 and 180."
+                )
+            radius = min(max(radius, 0), self.MAX_RADIUS_KM)
+
+            # Bounding box prefilter on the (latitude, longitude) index, then
+            # exact haversine distance for the rows inside the box
+            min_lat, max_lat, min_lng, max_lng = bounding_box(
+                latitude, longitude, radius
+            )
+            places = (
+                Place.objects.select_related("owner")
+                .prefetch_related(
+                    Prefetch(
+                        "images",
+                        queryset=Image.objects.only("id", "place", "image", "variants")[
+                            :1
+                        ],
+                        to_attr="first_image",
+                    ),
+                )
+                .filter(
+                    is_available=True,
+                    latitude__range=(min_lat, max_lat),
+                    longitude__range=(min_lng, max_lng),
+                )
+            )
+            places = filter_places(places, request.query_params)
+            places = (
+                places.annotate(distance=haversine_distance(latitude, longitude))
+                .filter(distance__lte=radius)
+                .order_by("distance", "id")
+            )
+
+            paginator = self.pagination_class()
+            paginated_places = paginator.paginate_queryset(places, request)
+            serializer = self.serializer_class(
+                paginated_places, many=True, context={"request": request}
+            )
+            return paginator.get_paginated_response(serializer.data)
+
+        except ValueError as e:
+            return common_response(400, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class PlaceMapClusterAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            try:
+                min_lng, min_lat, max_lng, max_lat = [
+                    float(value) for value in request.query_params["bbox"].split(",")
+                ]
+                zoom = int(request.query_params.get("zoom", 12))
+            except (KeyError, ValueError):
+                return common_response(
+                    400,
+                    "'bbox' is required as 'min_lng,min_lat,max_lng,max_lat' and 'zoom' must be an integer.",
+                )
+            precision = clamp_geohash_precision(
+                geohash_precision_for_zoom(zoom),
+                max(max_lat - min_lat, 0),
+                max(max_lng - min_lng, 0),
+            )
+
+            places = Place.objects.filter(
+                is_available=True,
+                latitude__range=(min_lat, max_lat),
+                longitude__range=(min_lng, max_lng),
+            )
+            places = filter_places(places, request.query_params)
+
+            # One GROUP BY over the geohash prefix of the requested precision
+            clusters = (
+                places.annotate(cell=Substr("geohash", 1, precision))
+                .values("cell")
+                .annotate(
+                    count=Count("id"),
+                    latitude=Avg("latitude"),
+                    longitude=Avg("longitude"),
+                    min_rent=Min("rent_per_month"),
+                    max_rent=Max("rent_per_month"),
+                )
+                .order_by()
+            )
+
+            data = {
+                "zoom": zoom,
+                "precision": precision,
+                "clusters": [
+                    {
+                        "cell": cluster["cell"],
+                        "count": cluster["count"],
+                        "latitude": float(cluster["latitude"]),
+                        "longitude": float(cluster["longitude"]),
+                        "min_rent": float(cluster["min_rent"]),
+                        "max_rent": float(cluster["max_rent"]),
+                    }
+                    for cluster in clusters
+                ],
+            }
+            return common_response(200, "Map clusters fetched successfully.", data)
+        except ValueError as e:
+            return common_response(400, str(e))
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
 class PlaceAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -191,6 +413,7 @@ class PlaceAPIView(APIView):
 
             if serializer.is_valid(raise_exception=True):
                 place = serializer.create(serializer.validated_data)
+                place = Place.objects.with_details().get(pk=place.pk)
 
                 Notification.objects.create(
                     user=request.user,
@@ -219,6 +442,39 @@ class PlaceAPIView(APIView):
             return common_response(400, str(e))
 
 
+class PlaceImportAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            upload = request.FILES.get("file")
+            if not upload:
+                return common_response(400, "A CSV or JSONL 'file' is required.")
+
+            file_format = request.data.get("format") or detect_format(upload.name)
+            if file_format not in ("csv", "jsonl"):
+                return common_response(400, "Unsupported format, use 'csv' or 'jsonl'.")
+
+            report = PlaceImporter(request.user).run(read_rows(upload, file_format))
+
+            if report["created"]:
+                Notification.objects.create(
+                    user=request.user,
+                    title="Places Imported",
+                    message=f"{report['created']} places imported successfully.",
+                    type="success",
+                    is_read=False,
+                )
+            return common_response(
+                201 if report["created"] else 200,
+                f"Imported {report['created']} places, {report['failed']} rows failed.",
+                report,
+            )
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
 class PlaceUpdateAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -237,7 +493,7 @@ class PlaceUpdateAPIView(APIView):
                 place, data=request.data, partial=True, context={"request": request}
             )
             if serializer.is_valid():
-                place = serializer.save()
+                place = Place.objects.with_details().get(pk=serializer.save().pk)
                 return common_response(
                     200,
                     "Place updated successfully.",
@@ -273,29 +529,45 @@ class PlaceDeleteAPIView(APIView):
 
 class FeaturedPlaceListAPIView(APIView):
     permission_classes = [AllowAny]
-    serializer_class = PlaceListSerializer
 
     def get(self, request):
         try:
-            featured_places = (
-                Place.objects.select_related("owner")
-                .prefetch_related(
-                    Prefetch(
-                        "images",
-                        queryset=Image.objects.only("id", "image")[:1],
-                        to_attr="first_image",
-                    ),
+            rotation = request.query_params.get("rotate")  # 'true' or an offset
+            try:
+                limit = request.query_params.get("limit")
+                limit = int(limit) if limit is not None else None
+                offset = None
+                if rotation and rotation != "false":
+                    offset = current_rotation() if rotation == "true" else int(rotation)
+            except ValueError:
+                return common_response(
+                    400, "'rotate' and 'limit' must be whole numbers."
                 )
-                .filter(featured=True, is_available=True)
-            )
-            serializer = self.serializer_class(
-                featured_places, many=True, context={"request": request}
-            )
+
+            places = get_featured_snapshot()["places"]
+
+            # Rotation: shift the start so every featured place gets the front
+            if offset is not None:
+                places = rotate(places, offset)
+
+            # Limit; without one the whole snapshot is returned
+            if limit is not None:
+                places = places[: min(max(limit, 0), FeaturedPlaces.MAX_LIMIT)]
+
+            # The snapshot is shared, so the bookmark flag is set per request
+            bookmarked_ids = request_bookmarked_place_ids(request)
+            places = [
+                {
+                    **place,
+                    "image": absolute_url(place["image"], request),
+                    "image_webp": absolute_url(place.get("image_webp"), request),
+                    "is_bookmarked": place["id"] in bookmarked_ids,
+                }
+                for place in places
+            ]
             if request.accepted_renderer.format == "api":
-                return Response(serializer.data)
-            return common_response(
-                200, "Featured places fetched successfully.", serializer.data
-            )
+                return Response(places)
+            return common_response(200, "Featured places fetched successfully.", places)
         except Exception as e:
             return common_response(400, str(e))
 
@@ -304,9 +576,11 @@ class PlaceDetailsAPIView(APIView):
     permission_classes = [AllowAny]
     serializer_class = PlaceDetailsSerializer
 
+    # Answers 304 from a one-row version lookup before serializing
+    @method_decorator(condition(etag_func=place_detail_etag))
     def get(self, request, slug):
         try:
-            place = Place.objects.get(slug=slug)
+            place = Place.objects.with_details().get(slug=slug)
             serializer = self.serializer_class(place, context={"request": request})
             if request.accepted_renderer.format == "api":
                 return Response(serializer.data)
@@ -319,6 +593,93 @@ class PlaceDetailsAPIView(APIView):
             return common_response(400, str(e))
 
 
+class PlaceReviewListAPIView(APIView):
+    permission_classes = [AllowAny]
+    pagination_class = ReviewPagination
+
+    def get(self, request, slug):
+        try:
+            place_id = (
+                Place.objects.filter(slug=slug).values_list("id", flat=True).first()
+            )
+            if place_id is None:
+                return common_response(404, "Place not found.")
+
+            sort = request.query_params.get("sort", ReviewListing.DEFAULT_SORT)
+            if sort not in ReviewListing.SORT_OPTIONS:
+                return common_response(
+                    400,
+                    f"'sort' must be one of: {', '.join(ReviewListing.SORT_OPTIONS)}.",
+                )
+
+            reviews = (
+                PlaceReview.objects.select_related("reviewer")
+                .filter(place_id=place_id)
+                .order_by(ReviewListing.SORT_OPTIONS[sort])
+            )
+
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(reviews, request)
+            serializer = PlaceReviewSerializer(
+                page, many=True, context={"request": request}
+            )
+            return paginator.get_paginated_response(serializer.data)
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class PlaceSimilarAPIView(APIView):
+    permission_classes = [AllowAny]
+    serializer_class = PlaceListSerializer
+
+    def get(self, request, slug):
+        try:
+            place_id = (
+                Place.objects.filter(slug=slug).values_list("id", flat=True).first()
+            )
+            if place_id is None:
+                return common_response(404, "Place not found.")
+
+            try:
+                limit = int(
+                    request.query_params.get("limit", SimilarPlaces.DEFAULT_LIMIT)
+                )
+            except ValueError:
+                return common_response(400, "'limit' must be a whole number.")
+            limit = min(max(limit, 1), SimilarPlaces.MAX_LIMIT)
+
+            ids = similar_place_ids(place_id, limit)
+            places = (
+                Place.objects.select_related("owner")
+                .prefetch_related(
+                    Prefetch(
+                        "images",
+                        queryset=Image.objects.only("id", "place", "image", "variants")[
+                            :1
+                        ],
+                        to_attr="first_image",
+                    ),
+                )
+                .filter(id__in=ids, is_available=True)
+                .in_bulk()
+            )
+            # Keep the nearest first order, skipping places deleted meanwhile
+            places = [places[pk] for pk in ids if pk in places][:limit]
+
+            serializer = self.serializer_class(
+                places, many=True, context={"request": request}
+            )
+            if request.accepted_renderer.format == "api":
+                return Response(serializer.data)
+            return common_response(
+                200, "Similar places fetched successfully.", serializer.data
+            )
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
 # class ToggleBookmarkPlaceAPIView(APIView):
 #     permission_classes = [IsAuthenticated]
 
@@ -342,30 +703,53 @@ class PlaceDetailsAPIView(APIView):
 #             return common_response(400, str(e))
 
 
+def bookmark_response(request, slug, action):
+    result = bookmark_place(request.user.pk, slug, action)
+    if result is None:
+        return common_response(404, "Place not found.")
+    if result.own_place and action != "remove":
+        return common_response(400, "You cannot bookmark your own place.")
+
+    message = (
+        "Place added to bookmarks."
+        if result.bookmarked
+        else "Place removed from bookmarks."
+    )
+    return common_response(
+        200,
+        message,
+        {"bookmarked": result.bookmarked, "bookmark_count": result.bookmark_count},
+    )
+
+
 class ToggleBookmarkPlaceAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, slug):
         try:
-            place = Place.objects.get(slug=slug)
-            user = request.user
+            return bookmark_response(request, slug, "toggle")
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
 
-            if place.owner == user:
-                return common_response(400, "You cannot bookmark your own place.")
 
-            # Get or create Bookmark object for user
-            bookmark, _ = Bookmark.objects.get_or_create(user=user)
+class PlaceBookmarkAPIView(APIView):
+    """Idempotent bookmark writes: PUT adds the bookmark, DELETE removes it."""
 
-            if bookmark.places.filter(id=place.id).exists():
-                bookmark.places.remove(place)
-                return common_response(200, "Place removed from bookmarks.")
-            else:
-                bookmark.places.add(place)
-                return common_response(200, "Place added to bookmarks.")
+    permission_classes = [IsAuthenticated]
 
-        except Place.DoesNotExist:
-            return common_response(404, "Place not found.")
+    def put(self, request, slug):
+        try:
+            return bookmark_response(request, slug, "add")
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+    def delete(self, request, slug):
+        try:
+            return bookmark_response(request, slug, "remove")
         except Exception as e:
+            traceback.print_exc()
             return common_response(400, str(e))
 
 
@@ -0,0 +1,19 @@
+from django.contrib import admin
+from upload.models import ChunkedUpload
+
+
+# Register your models here.
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "user",
+        "filename",
+        "target",
+        "status",
+        "offset",
+        "total_size",
+    )
+    list_filter = ("status", "target")
+
+
+admin.site.register(ChunkedUpload, ChunkedUploadAdmin)
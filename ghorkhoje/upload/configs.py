@@ -0,0 +1,32 @@
+class UploadTarget:
+    PLACE_IMAGE = "PLACE_IMAGE"
+    CHAT_ATTACHMENT = "CHAT_ATTACHMENT"
+
+    CHOICES = [
+        (PLACE_IMAGE, "Place Image"),
+        (CHAT_ATTACHMENT, "Chat Attachment"),
+    ]
+
+    # Largest file each target accepts, in bytes
+    MAX_SIZE = {
+        PLACE_IMAGE: 5000 * 1024,  # matches validate_image_size
+        CHAT_ATTACHMENT: 20 * 1024 * 1024,
+    }
+
+
+class UploadStatus:
+    UPLOADING = "UPLOADING"
+    COMPLETED = "COMPLETED"
+
+    CHOICES = [
+        (UPLOADING, "Uploading"),
+        (COMPLETED, "Completed"),
+    ]
+
+
+class ChunkedUploadLimits:
+    MAX_CHUNK_SIZE = 2 * 1024 * 1024
+    # Partial uploads untouched for this long are removed
+    EXPIRY_HOURS = 24
+    # Completed upload records are kept this long for progress lookups
+    COMPLETED_RETENTION_DAYS = 7
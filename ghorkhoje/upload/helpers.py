@@ -0,0 +1,117 @@
+import os
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from PIL import Image as PillowImage
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+
+from chat.models import Conversation, Message
+from place.models import Image, ImageBlob, Place
+from upload.configs import UploadTarget
+from utils.functions import validate_image_file, validate_image_size
+from utils.media import media_url
+
+
+def resolve_target(upload, user):
+    """
+    Return the place or conversation an upload will be attached to, or
+    None when it does not exist or the user may not attach to it.
+    """
+    if upload.target == UploadTarget.PLACE_IMAGE:
+        return Place.objects.filter(slug=upload.target_id, owner=user).first()
+
+    if not upload.target_id.isdigit():
+        return None
+    conversation = Conversation.objects.filter(id=upload.target_id).first()
+    if conversation and conversation.can_user_access(user):
+        return conversation
+    return None
+
+
+def write_chunk(upload, offset, chunk):
+    """
+    Write `chunk` (an UploadedFile) at `offset` of the upload's temp file.
+    Anything after the offset, e.g. a half written earlier attempt, is
+    discarded first.
+    """
+    os.makedirs(os.path.dirname(upload.temp_path), exist_ok=True)
+    mode = "r+b" if os.path.exists(upload.temp_path) else "wb"
+    with open(upload.temp_path, mode) as temp_file:
+        temp_file.seek(offset)
+        temp_file.truncate()
+        for piece in chunk.chunks():
+            temp_file.write(piece)
+
+
+def received_size(upload):
+    try:
+        return os.path.getsize(upload.temp_path)
+    except FileNotFoundError:
+        return 0
+
+
+def prepare_upload(upload):
+    """
+    Validate a finished place image upload and store it as an image blob
+    file, outside the transaction that attaches it. Returns the prepared
+    ImageBlob, or None for other targets.
+    """
+    if upload.target != UploadTarget.PLACE_IMAGE:
+        return None
+
+    with open(upload.temp_path, "rb") as temp_file:
+        django_file = File(temp_file, name=upload.filename)
+        validate_image_file(django_file)
+        validate_image_size(django_file)
+        try:
+            PillowImage.open(temp_file).verify()
+        except Exception:
+            raise ValidationError("The uploaded file is not a valid image.")
+        temp_file.seek(0)
+        return ImageBlob.prepare(django_file)
+
+
+def attach_upload(upload, target, blob=None):
+    """
+    Turn a finished upload into a place Image, from the blob prepared by
+    prepare_upload(), or a chat Message attachment and return the created
+    object.
+    """
+    if upload.target == UploadTarget.PLACE_IMAGE:
+        image = Image(place=target, description=upload.description)
+        image.use_blob(ImageBlob.acquire(blob))
+        image.save()
+        return image
+
+    with open(upload.temp_path, "rb") as temp_file:
+        django_file = File(temp_file, name=upload.filename)
+        message = Message.objects.create(
+            conversation=target,
+            sender=upload.user,
+            content=upload.description,
+            attachment=django_file,
+        )
+
+    # Deliver it like a message sent over the socket, once the row exists
+    def broadcast():
+        async_to_sync(get_channel_layer().group_send)(
+            f"conversation_{target.id}",
+            {
+                "type": "chat_message",
+                "response": {
+                    "conversation_id": target.id,
+                    "sender": upload.user.full_name,
+                    "sender_id": upload.user.id,
+                    "message": message.content,
+                    "attachment": media_url(message.attachment),
+                    "timestamp": str(message.created_at),
+                },
+            },
+        )
+
+    # robust: a channel layer outage must not fail the committed upload
+    transaction.on_commit(broadcast, robust=True)
+    return message
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:19
+
+import django.db.models.deletion
+import upload.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('target', models.CharField(choices=[('PLACE_IMAGE', 'Place Image'), ('CHAT_ATTACHMENT', 'Chat Attachment')], max_length=20)),
+                ('target_id', models.CharField(max_length=300)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('UPLOADING', 'Uploading'), ('COMPLETED', 'Completed')], default='UPLOADING', max_length=20)),
+                ('result_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(default=upload.models.default_expiry)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunked_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'chunked_uploads',
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='chunked_upl_status_1f039a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from upload.configs import ChunkedUploadLimits, UploadStatus, UploadTarget
+from user.models import User
+
+
+def default_expiry():
+    return timezone.now() + timedelta(hours=ChunkedUploadLimits.EXPIRY_HOURS)
+
+
+class ChunkedUpload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, related_name="chunked_uploads", on_delete=models.CASCADE
+    )
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    # Bytes received so far; the next chunk must start here
+    offset = models.PositiveBigIntegerField(default=0)
+    target = models.CharField(max_length=20, choices=UploadTarget.CHOICES)
+    # Place slug or conversation id the finished file is attached to
+    target_id = models.CharField(max_length=300)
+    description = models.TextField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20, choices=UploadStatus.CHOICES, default=UploadStatus.UPLOADING
+    )
+    # Id of the Image or Message created on completion
+    result_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(default=default_expiry)
+
+    class Meta:
+        db_table = "chunked_uploads"
+        indexes = [
+            models.Index(fields=["status", "expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{self.id}.part")
+
+    @property
+    def progress(self):
+        if not self.total_size:
+            return 100.0
+        return round(self.offset * 100 / self.total_size, 2)
+
+    def delete_temp_file(self):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,46 @@
+import os
+
+from rest_framework import serializers
+
+from upload.configs import UploadTarget
+from upload.models import ChunkedUpload
+
+IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "webp"]
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = ChunkedUpload
+        fields = [
+            "id",
+            "filename",
+            "total_size",
+            "offset",
+            "progress",
+            "target",
+            "target_id",
+            "description",
+            "status",
+            "result_id",
+            "expires_at",
+        ]
+        read_only_fields = ["id", "offset", "status", "result_id", "expires_at"]
+
+    def validate(self, attrs):
+        target = attrs["target"]
+        max_size = UploadTarget.MAX_SIZE[target]
+        if attrs["total_size"] > max_size:
+            raise serializers.ValidationError(
+                {"total_size": f"File size must not exceed {max_size // 1024} KB."}
+            )
+        if target == UploadTarget.PLACE_IMAGE:
+            extension = os.path.splitext(attrs["filename"])[1][1:].lower()
+            if extension not in IMAGE_EXTENSIONS:
+                raise serializers.ValidationError(
+                    {
+                        "filename": f"Allowed extensions are: {', '.join(IMAGE_EXTENSIONS)}."
+                    }
+                )
+        return attrs
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from celery import shared_task
+
+from django.db.models import Q
+from django.utils import timezone
+
+from upload.configs import ChunkedUploadLimits, UploadStatus
+from upload.models import ChunkedUpload
+
+
+@shared_task(ignore_result=True)
+def cleanup_expired_uploads():
+    now = timezone.now()
+    expired = ChunkedUpload.objects.filter(
+        Q(status=UploadStatus.UPLOADING, expires_at__lt=now)
+        | Q(
+            status=UploadStatus.COMPLETED,
+            updated_at__lt=now
+            - timedelta(days=ChunkedUploadLimits.COMPLETED_RETENTION_DAYS),
+        )
+    )
+
+    removed = 0
+    for upload in expired.iterator():
+        upload.delete_temp_file()
+        upload.delete()
+        removed += 1
+    print(f"[{now}] Removed {removed} expired uploads")
@@ -0,0 +1,202 @@
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from PIL import Image as PillowImage
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+from chat.models import Conversation, Message
+from place.models import Image, ImageBlob, Place
+from upload.configs import UploadStatus, UploadTarget
+from upload.models import ChunkedUpload
+from user.models import User
+
+CONTENT = b"0123456789" * 10
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.upload_root = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        settings = override_settings(
+            CHUNKED_UPLOAD_ROOT=self.upload_root,
+            MEDIA_ROOT=self.media_root,
+            MEDIA_CDN_URL="",
+            CHANNEL_LAYERS={
+                "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.upload_root, True)
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+
+        self.user = User.objects.create_user(email="user@example.com", full_name="User")
+        self.other = User.objects.create_user(
+            email="other@example.com", full_name="Other"
+        )
+        self.conversation = Conversation.objects.create(
+            user=self.user, other_user=self.other
+        )
+        self.client.force_login(self.user)
+
+    def start(
+        self,
+        target=UploadTarget.CHAT_ATTACHMENT,
+        target_id=None,
+        filename="notes.txt",
+        content=CONTENT,
+    ):
+        response = self.client.post(
+            "/api/v1/uploads/",
+            {
+                "filename": filename,
+                "total_size": len(content),
+                "target": target,
+                "target_id": target_id or str(self.conversation.id),
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["data"]["id"]
+
+    def send_chunk(self, upload_id, offset, data):
+        return self.client.put(
+            f"/api/v1/uploads/{upload_id}/chunk/",
+            encode_multipart(
+                BOUNDARY,
+                {"offset": offset, "chunk": SimpleUploadedFile("chunk", data)},
+            ),
+            content_type=MULTIPART_CONTENT,
+        )
+
+    def test_resume_after_interruption(self):
+        upload_id = self.start()
+        self.assertEqual(self.send_chunk(upload_id, 0, CONTENT[:40]).status_code, 200)
+
+        # A new session asks where to continue
+        response = self.client.get(f"/api/v1/uploads/{upload_id}/")
+        self.assertEqual(response["Upload-Offset"], "40")
+        self.assertEqual(response.json()["data"]["offset"], 40)
+
+        response = self.send_chunk(upload_id, 40, CONTENT[40:])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Upload-Offset"], str(len(CONTENT)))
+        with open(ChunkedUpload.objects.get(pk=upload_id).temp_path, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+
+    def test_offset_conflict(self):
+        upload_id = self.start()
+        self.send_chunk(upload_id, 0, CONTENT[:40])
+
+        # The same chunk again, e.g. a retry after a lost response
+        response = self.send_chunk(upload_id, 0, CONTENT[:40])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Upload-Offset"], "40")
+        self.assertEqual(response.json()["message"], "Expected a chunk at offset 40.")
+
+        response = self.send_chunk(upload_id, 40, CONTENT[40:] + b"extra")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["message"], "Chunk goes past the declared file size."
+        )
+
+    def test_complete(self):
+        upload_id = self.start()
+        self.send_chunk(upload_id, 0, CONTENT[:40])
+
+        response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            response.json()["message"], "Upload is incomplete, next offset is 40."
+        )
+
+        self.send_chunk(upload_id, 40, CONTENT[40:])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data["status"], UploadStatus.COMPLETED)
+
+        message = Message.objects.get(pk=data["result_id"])
+        self.assertEqual(message.attachment.read(), CONTENT)
+        upload = ChunkedUpload.objects.get(pk=upload_id)
+        self.assertFalse(os.path.exists(upload.temp_path))
+
+        # Completing again returns the same result
+        response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        self.assertEqual(response.json()["data"]["result_id"], message.pk)
+
+    def listen(self):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"conversation_{self.conversation.id}", channel)
+
+        async def receive():
+            try:
+                return await asyncio.wait_for(layer.receive(channel), 0.2)
+            except asyncio.TimeoutError:
+                return None
+
+        return lambda: async_to_sync(receive)()
+
+    def test_message_is_broadcast_after_commit(self):
+        receive = self.listen()
+        upload_id = self.start()
+        self.send_chunk(upload_id, 0, CONTENT)
+
+        # The status update fails, rolling the message back with it
+        with patch.object(ChunkedUpload, "save", side_effect=DatabaseError("down")):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Message.objects.exists())
+        self.assertIsNone(receive())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        event = receive()
+        self.assertEqual(event["type"], "chat_message")
+        self.assertEqual(
+            event["response"]["message"],
+            Message.objects.get(pk=response.json()["data"]["result_id"]).content,
+        )
+
+    def test_complete_place_image(self):
+        # bulk_create skips Place.save, which needs PostgreSQL full text search
+        Place.objects.bulk_create(
+            [
+                Place(
+                    title="Flat",
+                    slug="flat",
+                    owner=self.user,
+                    city="Dhaka",
+                    area_name="Gulshan",
+                    rent_per_month=15000,
+                    latitude=23.7,
+                    longitude=90.4,
+                )
+            ]
+        )
+        buffer = io.BytesIO()
+        PillowImage.new("RGB", (16, 16), "red").save(buffer, "PNG")
+        content = buffer.getvalue()
+
+        upload_id = self.start(UploadTarget.PLACE_IMAGE, "flat", "photo.png", content)
+        self.send_chunk(upload_id, 0, content)
+        with self.captureOnCommitCallbacks():
+            response = self.client.post(f"/api/v1/uploads/{upload_id}/complete/")
+        self.assertEqual(response.status_code, 200)
+
+        image = Image.objects.get(pk=response.json()["data"]["result_id"])
+        self.assertEqual(image.blob, ImageBlob.objects.get())
+        self.assertEqual(image.image.read(), content)
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from upload.views import (
+    ChunkedUploadChunkAPIView,
+    ChunkedUploadCompleteAPIView,
+    ChunkedUploadCreateAPIView,
+    ChunkedUploadDetailAPIView,
+)
+
+upload_urlpatterns = [
+    path("", ChunkedUploadCreateAPIView.as_view()),
+    path("<uuid:upload_id>/", ChunkedUploadDetailAPIView.as_view()),
+    path("<uuid:upload_id>/chunk/", ChunkedUploadChunkAPIView.as_view()),
+    path("<uuid:upload_id>/complete/", ChunkedUploadCompleteAPIView.as_view()),
+]
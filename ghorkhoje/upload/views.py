@@ -0,0 +1,201 @@
+import traceback
+
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from place.models import ImageBlob
+from upload.configs import ChunkedUploadLimits, UploadStatus
+from upload.helpers import (
+    attach_upload,
+    prepare_upload,
+    received_size,
+    resolve_target,
+    write_chunk,
+)
+from upload.models import ChunkedUpload, default_expiry
+from upload.serializers import ChunkedUploadSerializer
+from utils.responses import common_response
+
+
+def offset_response(status_code, message, upload):
+    # Clients resume from this header after a failed or conflicting chunk.
+    # Error responses carry only the message, common_response would
+    # replace it with the data
+    if status_code // 100 == 2:
+        response = common_response(
+            status_code, message, ChunkedUploadSerializer(upload).data
+        )
+    else:
+        response = common_response(status_code, message)
+    response["Upload-Offset"] = str(upload.offset)
+    return response
+
+
+class ChunkedUploadCreateAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        try:
+            serializer = ChunkedUploadSerializer(data=request.data)
+            if not serializer.is_valid():
+                return common_response(400, "Invalid data.", serializer.errors)
+
+            upload = ChunkedUpload(user=request.user, **serializer.validated_data)
+            if resolve_target(upload, request.user) is None:
+                return common_response(
+                    403, "You are not allowed to upload to this target."
+                )
+            upload.save()
+            return offset_response(201, "Upload started.", upload)
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class ChunkedUploadDetailAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        try:
+            upload = ChunkedUpload.objects.filter(
+                id=upload_id, user=request.user
+            ).first()
+            if not upload:
+                return common_response(404, "Upload not found.")
+            return offset_response(200, "Upload fetched successfully.", upload)
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+    def delete(self, request, upload_id):
+        try:
+            upload = ChunkedUpload.objects.filter(
+                id=upload_id, user=request.user, status=UploadStatus.UPLOADING
+            ).first()
+            if not upload:
+                return common_response(404, "Upload not found.")
+            upload.delete_temp_file()
+            upload.delete()
+            return common_response(200, "Upload cancelled.")
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class ChunkedUploadChunkAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, upload_id):
+        try:
+            chunk = request.FILES.get("chunk")
+            if not chunk:
+                return common_response(400, "A 'chunk' file is required.")
+            if chunk.size > ChunkedUploadLimits.MAX_CHUNK_SIZE:
+                return common_response(
+                    400,
+                    f"Chunks must not exceed {ChunkedUploadLimits.MAX_CHUNK_SIZE} bytes.",
+                )
+            try:
+                offset = int(request.data.get("offset"))
+            except (TypeError, ValueError):
+                return common_response(400, "A numeric 'offset' is required.")
+
+            with transaction.atomic():
+                # Lock the row so parallel chunks for one upload are serialized
+                upload = (
+                    ChunkedUpload.objects.select_for_update()
+                    .filter(id=upload_id, user=request.user)
+                    .first()
+                )
+                if not upload:
+                    return common_response(404, "Upload not found.")
+                if upload.status != UploadStatus.UPLOADING:
+                    return offset_response(409, "Upload is already completed.", upload)
+
+                # A crash between writing and saving can leave the file
+                # shorter than the recorded offset; resume from what is on disk
+                on_disk = received_size(upload)
+                if on_disk < upload.offset:
+                    upload.offset = on_disk
+                    upload.save(update_fields=["offset", "updated_at"])
+
+                if offset != upload.offset:
+                    return offset_response(
+                        409, f"Expected a chunk at offset {upload.offset}.", upload
+                    )
+                if offset + chunk.size > upload.total_size:
+                    return offset_response(
+                        400, "Chunk goes past the declared file size.", upload
+                    )
+
+                write_chunk(upload, offset, chunk)
+                upload.offset = offset + chunk.size
+                upload.expires_at = default_expiry()
+                upload.save(update_fields=["offset", "expires_at", "updated_at"])
+
+            return offset_response(200, "Chunk received.", upload)
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
+class ChunkedUploadCompleteAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        blob = None
+        try:
+            # Place images are validated and stored before taking the row
+            # lock, which then only covers inserting the rows
+            pending = ChunkedUpload.objects.filter(
+                id=upload_id, user=request.user, status=UploadStatus.UPLOADING
+            ).first()
+            if pending and pending.offset == pending.total_size:
+                blob = prepare_upload(pending)
+
+            with transaction.atomic():
+                upload = (
+                    ChunkedUpload.objects.select_for_update()
+                    .filter(id=upload_id, user=request.user)
+                    .first()
+                )
+                if not upload:
+                    return common_response(404, "Upload not found.")
+                if upload.status == UploadStatus.COMPLETED:
+                    # Repeated completes return the existing result
+                    return offset_response(200, "Upload already completed.", upload)
+                if upload.offset != upload.total_size:
+                    return offset_response(
+                        409,
+                        f"Upload is incomplete, next offset is {upload.offset}.",
+                        upload,
+                    )
+
+                target = resolve_target(upload, request.user)
+                if target is None:
+                    return common_response(
+                        403, "You are not allowed to upload to this target."
+                    )
+
+                if blob is None:
+                    # The last chunk arrived after the unlocked read
+                    blob = prepare_upload(upload)
+                result = attach_upload(upload, target, blob)
+
+                upload.status = UploadStatus.COMPLETED
+                upload.result_id = result.pk
+                upload.save(update_fields=["status", "result_id", "updated_at"])
+                transaction.on_commit(upload.delete_temp_file)
+
+            return offset_response(200, "Upload completed.", upload)
+        except ValidationError as e:
+            return common_response(400, " ".join(e.messages))
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+        finally:
+            if blob is not None:
+                ImageBlob.discard_unused([blob])
@@ -11,3 +11,23 @@ class Gender:
     OTHERS = "OTHERS"
 
     CHOICES = [(MALE, "Male"), (FEMALE, "Female"), (OTHERS, "Others")]
+
+
+class HostRating:
+    OVERALL = "overall"
+    COMMUNICATION = "communication"
+    CLEANLINESS = "cleanliness"
+    MAINTENANCE = "maintenance"
+    PRIVACY = "privacy"
+    FINANCIAL_TRANSPARENCY = "financial_transparency"
+    ATTITUDE = "attitude"
+
+    FIELDS = [
+        OVERALL,
+        COMMUNICATION,
+        CLEANLINESS,
+        MAINTENANCE,
+        PRIVACY,
+        FINANCIAL_TRANSPARENCY,
+        ATTITUDE,
+    ]
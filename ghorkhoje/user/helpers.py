@@ -479,81 +479,46 @@ def occupency_rate(request):
 
 
 def performance_matrics(request):
-    places = Place.objects.filter(owner=request.user)
-
-    # Helper accumulators
-    metrics = {
-        "overall": [],
-        "value_for_money": [],
-        "cleanliness": [],
-        "description_match": [],
-        "location_convenience": [],
-        "neighborhood": [],
-    }
-
-    for place in places:
-        overall = place.get_average_overall()
-        if overall > 0:
-            metrics["overall"].append(overall)
-
-        value_for_money = place.get_average_value_for_money_rating()
-        if value_for_money > 0:
-            metrics["value_for_money"].append(value_for_money)
-
-        cleanliness = place.get_average_cleanliness_rating()
-        if cleanliness > 0:
-            metrics["cleanliness"].append(cleanliness)
-
-        description_match = place.get_average_description_match_rating()
-        if description_match > 0:
-            metrics["description_match"].append(description_match)
-
-        location_convenience = place.get_average_location_convenience_rating()
-        if location_convenience > 0:
-            metrics["location_convenience"].append(location_convenience)
-
-        neighborhood = place.get_average_neighborhood_rating()
-        if neighborhood > 0:
-            metrics["neighborhood"].append(neighborhood)
+    # Average of each dimension across the user's reviewed places, one query
+    summary = Place.objects.filter(owner=request.user).rating_summary()
 
-    # Average each metric across all the user's places
-    def avg(values):
-        return round(sum(values) / len(values), 2) if values else 0
+    def avg(value):
+        return round(value, 2)
 
     res = [
         {
             "metric": "Over All",
-            "value": avg(metrics["overall"]),
+            "value": avg(summary["overall"]),
             # "target": 90,
             "color": "#10b981",
         },
         {
             "metric": "Value for Money",
-            "value": avg(metrics["value_for_money"]),
+            "value": avg(summary["value_for_money"]),
             # "target": 4.5,
             "color": "#3b82f6",
         },
         {
             "metric": "Cleanliness",
-            "value": avg(metrics["cleanliness"]),
+            "value": avg(summary["cleanliness"]),
             # "target": 4.5,
             "color": "#f59e0b",
         },
         {
             "metric": "Description Match",
-            "value": avg(metrics["description_match"]),
+            "value": avg(summary["description_match"]),
             # "target": 4.3,
             "color": "#6366f1",
         },
         {
             "metric": "Location Convenience",
-            "value": avg(metrics["location_convenience"]),
+            "value": avg(summary["location_convenience"]),
             # "target": 4.4,
             "color": "#ec4899",
         },
         {
             "metric": "Neighborhood",
-            "value": avg(metrics["neighborhood"]),
+            "value": avg(summary["neighborhood"]),
             # "target": 4.3,
             "color": "#eab308",
         },
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from user.models import HostStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the host stats rows from reviews and owned places."
+
+    def handle(self, *args, **options):
+        rebuilt = HostStats.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt host stats for {rebuilt} users.")
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='user_notifi_user_id_fe0afd_idx'),
+        ),
+    ]
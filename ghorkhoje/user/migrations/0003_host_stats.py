@@ -0,0 +1,97 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+RATING_FIELDS = [
+    'overall',
+    'communication',
+    'cleanliness',
+    'maintenance',
+    'privacy',
+    'financial_transparency',
+    'attitude',
+]
+
+
+def backfill_host_stats(apps, schema_editor):
+    HostStats = apps.get_model('user', 'HostStats')
+    Review = apps.get_model('user', 'Review')
+    Place = apps.get_model('place', 'Place')
+
+    stats = {}
+    reviews = (
+        Review.objects.filter(reviewee__isnull=False)
+        .values('reviewee_id')
+        .annotate(
+            review_count=Count('id'),
+            **{f'{field}_count': Count(field) for field in RATING_FIELDS},
+            **{f'{field}_sum': Sum(field) for field in RATING_FIELDS},
+        )
+        .order_by()
+    )
+    for row in reviews:
+        host = stats.setdefault(row['reviewee_id'], HostStats(user_id=row['reviewee_id']))
+        host.review_count = row['review_count']
+        for field in RATING_FIELDS:
+            count = row[f'{field}_count']
+            total = row[f'{field}_sum'] or 0
+            setattr(host, f'{field}_count', count)
+            setattr(host, f'{field}_sum', total)
+            setattr(host, f'{field}_avg', total / count if count else None)
+
+    places = Place.objects.values('owner_id').annotate(count=Count('id')).order_by()
+    for row in places:
+        host = stats.setdefault(row['owner_id'], HostStats(user_id=row['owner_id']))
+        host.hosted_places_count = row['count']
+
+    HostStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_keyset_pagination_indexes'),
+        ('place', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HostStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='host_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('hosted_places_count', models.PositiveIntegerField(default=0)),
+                ('overall_count', models.PositiveIntegerField(default=0)),
+                ('overall_sum', models.PositiveIntegerField(default=0)),
+                ('overall_avg', models.FloatField(blank=True, null=True)),
+                ('communication_count', models.PositiveIntegerField(default=0)),
+                ('communication_sum', models.PositiveIntegerField(default=0)),
+                ('communication_avg', models.FloatField(blank=True, null=True)),
+                ('cleanliness_count', models.PositiveIntegerField(default=0)),
+                ('cleanliness_sum', models.PositiveIntegerField(default=0)),
+                ('cleanliness_avg', models.FloatField(blank=True, null=True)),
+                ('maintenance_count', models.PositiveIntegerField(default=0)),
+                ('maintenance_sum', models.PositiveIntegerField(default=0)),
+                ('maintenance_avg', models.FloatField(blank=True, null=True)),
+                ('privacy_count', models.PositiveIntegerField(default=0)),
+                ('privacy_sum', models.PositiveIntegerField(default=0)),
+                ('privacy_avg', models.FloatField(blank=True, null=True)),
+                ('financial_transparency_count', models.PositiveIntegerField(default=0)),
+                ('financial_transparency_sum', models.PositiveIntegerField(default=0)),
+                ('financial_transparency_avg', models.FloatField(blank=True, null=True)),
+                ('attitude_count', models.PositiveIntegerField(default=0)),
+                ('attitude_sum', models.PositiveIntegerField(default=0)),
+                ('attitude_avg', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Host Stats',
+                'verbose_name_plural': 'Host Stats',
+                'db_table': 'host_stats',
+            },
+        ),
+        migrations.RunPython(backfill_host_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_host_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['reviewee', 'created_at'], name='user_review_reviewe_252d0f_idx'),
+        ),
+    ]
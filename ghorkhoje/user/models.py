@@ -1,15 +1,17 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import (
     BaseUserManager,
     AbstractBaseUser,
     PermissionsMixin,
 )
-from django.db.models import Avg
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-from user.configs import UserTypes, Gender
+from user.configs import UserTypes, Gender, HostRating
 
 
 class CustomUserManager(BaseUserManager):
@@ -110,52 +112,41 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = CustomUserManager()
     USERNAME_FIELD = "email"
 
+    def get_host_stats(self):
+        # Hosts without reviews or places may not have a stats row yet
+        if not hasattr(self, "_host_stats_cache"):
+            try:
+                self._host_stats_cache = self.host_stats
+            except HostStats.DoesNotExist:
+                self._host_stats_cache = HostStats(user=self)
+        return self._host_stats_cache
+
     def get_average_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("overall"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.OVERALL)
 
     def get_average_communication_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("communication"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.COMMUNICATION)
 
     def get_average_cleanliness_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("cleanliness"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.CLEANLINESS)
 
     def get_average_maintenance_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("maintenance"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.MAINTENANCE)
 
     def get_average_privacy_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("privacy"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.PRIVACY)
 
     def get_average_financial_transparency_rating(self):
-        result = self.received_reviews.aggregate(
-            avg_rating=Avg("financial_transparency")
-        )
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.FINANCIAL_TRANSPARENCY)
 
     def get_average_attitude_rating(self):
-        result = self.received_reviews.aggregate(avg_rating=Avg("attitude"))
-        return (
-            round(result["avg_rating"], 2) if result["avg_rating"] is not None else None
-        )
+        return self.get_host_stats().get_average(HostRating.ATTITUDE)
 
     def get_review_count(self):
-        return self.received_reviews.count()
+        return self.get_host_stats().review_count
+
+    def get_hosted_places_count(self):
+        return self.get_host_stats().hosted_places_count
 
     def __str__(self):
         return self.email if self.email else self.phone
@@ -223,9 +214,181 @@ class Review(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Review listing of a host, newest first
+            models.Index(fields=["reviewee", "created_at"]),
+        ]
+
     def __str__(self):
         return f"Review by {self.reviewer} to {self.reviewee} - Rating: {self.overall}"
 
+    def get_ratings(self):
+        return {field: getattr(self, field) for field in HostRating.FIELDS}
+
+    def save(self, *args, **kwargs):
+        # Keep the reviewee's HostStats in step with this review
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = (
+                    Review.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values("reviewee_id", *HostRating.FIELDS)
+                    .first()
+                )
+            super().save(*args, **kwargs)
+
+            if previous is not None:
+                HostStats.apply_review_delta(previous["reviewee_id"], -1, previous)
+            HostStats.apply_review_delta(self.reviewee_id, 1, self.get_ratings())
+
+
+class HostStats(models.Model):
+    """
+    Per-host review and listing summary, maintained from Review and Place
+    writes so host payloads read one row instead of aggregating.
+    """
+
+    user = models.OneToOneField(
+        User, related_name="host_stats", on_delete=models.CASCADE, primary_key=True
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    hosted_places_count = models.PositiveIntegerField(default=0)
+
+    # Review ratings are nullable, so every dimension keeps its own count
+    overall_count = models.PositiveIntegerField(default=0)
+    overall_sum = models.PositiveIntegerField(default=0)
+    overall_avg = models.FloatField(null=True, blank=True)
+    communication_count = models.PositiveIntegerField(default=0)
+    communication_sum = models.PositiveIntegerField(default=0)
+    communication_avg = models.FloatField(null=True, blank=True)
+    cleanliness_count = models.PositiveIntegerField(default=0)
+    cleanliness_sum = models.PositiveIntegerField(default=0)
+    cleanliness_avg = models.FloatField(null=True, blank=True)
+    maintenance_count = models.PositiveIntegerField(default=0)
+    maintenance_sum = models.PositiveIntegerField(default=0)
+    maintenance_avg = models.FloatField(null=True, blank=True)
+    privacy_count = models.PositiveIntegerField(default=0)
+    privacy_sum = models.PositiveIntegerField(default=0)
+    privacy_avg = models.FloatField(null=True, blank=True)
+    financial_transparency_count = models.PositiveIntegerField(default=0)
+    financial_transparency_sum = models.PositiveIntegerField(default=0)
+    financial_transparency_avg = models.FloatField(null=True, blank=True)
+    attitude_count = models.PositiveIntegerField(default=0)
+    attitude_sum = models.PositiveIntegerField(default=0)
+    attitude_avg = models.FloatField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "host_stats"
+        verbose_name = "Host Stats"
+        verbose_name_plural = "Host Stats"
+
+    def __str__(self):
+        return f"Host stats for {self.user_id}"
+
+    def get_average(self, field):
+        avg = getattr(self, f"{field}_avg")
+        return round(avg, 2) if avg is not None else None
+
+    @classmethod
+    def apply_review_delta(cls, user_id, direction, ratings):
+        """
+        Add (direction=1) or remove (direction=-1) one review's ratings
+        from the host's stats in a single UPDATE.
+        """
+        if user_id is None:
+            return
+
+        updates = {
+            "review_count": F("review_count") + direction,
+            "updated_at": timezone.now(),
+        }
+        for field in HostRating.FIELDS:
+            value = ratings[field]
+            if value is None:
+                continue
+            new_count = F(f"{field}_count") + direction
+            new_sum = F(f"{field}_sum") + direction * value
+            updates[f"{field}_count"] = new_count
+            updates[f"{field}_sum"] = new_sum
+            updates[f"{field}_avg"] = Cast(new_sum, FloatField()) / NullIf(new_count, 0)
+        cls._apply_updates(user_id, updates, create=direction > 0)
+
+    @classmethod
+    def apply_hosted_places_delta(cls, user_id, delta):
+        cls._apply_updates(
+            user_id,
+            {
+                "hosted_places_count": F("hosted_places_count") + delta,
+                "updated_at": timezone.now(),
+            },
+            create=delta > 0,
+        )
+
+    @classmethod
+    def _apply_updates(cls, user_id, updates, create):
+        # One UPDATE when the row exists, which is the common case
+        if cls.objects.filter(user_id=user_id).update(**updates) or not create:
+            # Removals never create a row: a missing one has nothing to
+            # subtract from, e.g. when the host is being deleted and the
+            # cascade removed the stats before the places and reviews
+            return
+        cls.objects.get_or_create(user_id=user_id)
+        cls.objects.filter(user_id=user_id).update(**updates)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute every host's stats from reviews and places.
+        Returns the number of stats rows written.
+        """
+        from place.models import Place
+
+        stats = {}
+
+        reviews = (
+            Review.objects.filter(reviewee__isnull=False)
+            .values("reviewee_id")
+            .annotate(
+                review_count=Count("id"),
+                **{f"{field}_count": Count(field) for field in HostRating.FIELDS},
+                **{f"{field}_sum": Sum(field) for field in HostRating.FIELDS},
+            )
+            .order_by()
+        )
+        for row in reviews:
+            host = stats.setdefault(row["reviewee_id"], cls(user_id=row["reviewee_id"]))
+            host.review_count = row["review_count"]
+            for field in HostRating.FIELDS:
+                count = row[f"{field}_count"]
+                total = row[f"{field}_sum"] or 0
+                setattr(host, f"{field}_count", count)
+                setattr(host, f"{field}_sum", total)
+                setattr(host, f"{field}_avg", total / count if count else None)
+
+        places = Place.objects.values("owner_id").annotate(count=Count("id")).order_by()
+        for row in places:
+            host = stats.setdefault(row["owner_id"], cls(user_id=row["owner_id"]))
+            host.hosted_places_count = row["count"]
+
+        update_fields = ["review_count", "hosted_places_count", "updated_at"]
+        for field in HostRating.FIELDS:
+            update_fields += [f"{field}_count", f"{field}_sum", f"{field}_avg"]
+
+        with transaction.atomic():
+            cls.objects.exclude(user_id__in=list(stats)).delete()
+            cls.objects.bulk_create(
+                stats.values(),
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=update_fields,
+                batch_size=500,
+            )
+        return len(stats)
+
 
 class LandlordApplication(models.Model):
     STATUS = (
@@ -304,5 +467,8 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "created_at", "id"]),
+        ]
         verbose_name = "Notification"
         verbose_name_plural = "Notifications"
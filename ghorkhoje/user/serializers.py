@@ -6,10 +6,16 @@ from rest_framework import serializers
 
 from django.conf import settings
 from user.models import *
+from utils.media import MediaModelSerializer, media_url
 from utils.responses import custom_exception
 
 from place.models import Place
-from place.serializer import CategorySerializer, ImageSerializer, PlaceDetailsSerializer
+from place.serializer import (
+    CategorySerializer,
+    ImageSerializer,
+    PlaceDetailsSerializer,
+    latest_reviews,
+)
 
 
 class UserRegistrationSerializer(serializers.Serializer):
@@ -113,7 +119,7 @@ class ResetPasswordSerializer(serializers.Serializer):
         return user
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(MediaModelSerializer):
     address = serializers.SerializerMethodField()
     social_links = serializers.SerializerMethodField()
     profile_image = serializers.SerializerMethodField()
@@ -160,17 +166,10 @@ class UserProfileSerializer(serializers.ModelSerializer):
         }
 
     def get_profile_image(self, obj):
-        request = self.context.get("request")
-        if obj.profile_image:
-            return (
-                request.build_absolute_uri(obj.profile_image.url)
-                if hasattr(obj.profile_image, "url")
-                else None
-            )
-        return None
+        return media_url(obj.profile_image, self.context.get("request"))
 
 
-class UpdataProfileSerializer(serializers.ModelSerializer):
+class UpdataProfileSerializer(MediaModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -283,14 +282,7 @@ class ReviewerSerializer(serializers.ModelSerializer):
         fields = ["id", "full_name", "profile_image"]
 
     def get_profile_image(self, obj):
-        request = self.context.get("request")
-        if obj.profile_image:
-            return (
-                request.build_absolute_uri(obj.profile_image.url)
-                if hasattr(obj.profile_image, "url")
-                else None
-            )
-        return None
+        return media_url(obj.profile_image, self.context.get("request"))
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -344,15 +336,10 @@ class PlaceSerializer(serializers.ModelSerializer):
         ]
 
     def get_image(self, obj):
-        request = self.context.get("request")
-        if obj.images.exists():
-            image = obj.images.first()
-            return (
-                request.build_absolute_uri(image.image.url)
-                if hasattr(image.image, "url")
-                else None
-            )
-        return None
+        image = obj.images.first()
+        if image is None:
+            return None
+        return media_url(image.image, self.context.get("request"))
 
 
 class AboutHostSerializer(serializers.ModelSerializer):
@@ -369,7 +356,9 @@ class AboutHostSerializer(serializers.ModelSerializer):
     attitude_rating = serializers.SerializerMethodField()
 
     reviews = serializers.SerializerMethodField()
+    review_count = serializers.SerializerMethodField()
     hosted_places = serializers.SerializerMethodField()
+    hosted_places_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -397,7 +386,9 @@ class AboutHostSerializer(serializers.ModelSerializer):
             "financial_transparency_rating",
             "attitude_rating",
             "reviews",
+            "review_count",
             "hosted_places",
+            "hosted_places_count",
         ]
 
     def get_address(self, obj):
@@ -419,14 +410,7 @@ class AboutHostSerializer(serializers.ModelSerializer):
         }
 
     def get_profile_image(self, obj):
-        request = self.context.get("request")
-        if obj.profile_image:
-            return (
-                request.build_absolute_uri(obj.profile_image.url)
-                if hasattr(obj.profile_image, "url")
-                else None
-            )
-        return None
+        return media_url(obj.profile_image, self.context.get("request"))
 
     def get_average_rating(self, obj):
         return obj.get_average_rating()
@@ -449,13 +433,17 @@ class AboutHostSerializer(serializers.ModelSerializer):
     def get_attitude_rating(self, obj):
         return obj.get_average_attitude_rating()
 
-    def get_hosted_places(self, obj):
-        return Place.objects.filter(owner=obj).count()
-
     def get_reviews(self, obj):
-        reviews = obj.received_reviews.all()
+        # The rest are served by /user/about-host/<pk>/reviews/
+        reviews = latest_reviews(obj, "latest_received_reviews", "received_reviews")
         return ReviewSerializer(reviews, many=True, context=self.context).data
 
+    def get_review_count(self, obj):
+        return obj.get_review_count()
+
+    def get_hosted_places_count(self, obj):
+        return obj.get_hosted_places_count()
+
     def get_hosted_places(self, obj):
         places = obj.owned_places.all()
         return PlaceSerializer(places, many=True, context=self.context).data
@@ -1,7 +1,7 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import pre_save, post_delete
 from django.dispatch import receiver
 
-from user.models import LandlordApplication
+from user.models import LandlordApplication, Review, HostStats
 from user.helpers import send_application_status_update_email
 
 
@@ -27,3 +27,9 @@ def notify_on_application_status_update(sender, instance, **kwargs):
         from django.db import transaction
 
         transaction.on_commit(send_email)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_host_stats(sender, instance, **kwargs):
+    # Runs inside the delete transaction, also for queryset and cascade deletes
+    HostStats.apply_review_delta(instance.reviewee_id, -1, instance.get_ratings())
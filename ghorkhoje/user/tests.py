@@ -1,3 +1,85 @@
-from django.test import TestCase
+from unittest import skipUnless
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from place.models import Place
+from user.models import HostStats, Review, User
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@skipUnless(connection.vendor == "postgresql", "Place.save uses full text search")
+@override_settings(CACHES=LOCMEM_CACHES)
+class HostStatsTests(TestCase):
+    def setUp(self):
+        self.host = User.objects.create_user(email="host@example.com", full_name="Host")
+        self.guest = User.objects.create_user(
+            email="guest@example.com", full_name="Guest"
+        )
+
+    def create_place(self):
+        return Place.objects.create(
+            title="Flat",
+            owner=self.host,
+            city="Dhaka",
+            area_name="Gulshan",
+            rent_per_month=15000,
+            latitude=23.7,
+            longitude=90.4,
+        )
+
+    def test_counts_follow_places_and_reviews(self):
+        place = self.create_place()
+        review = Review.objects.create(
+            reviewer=self.guest, reviewee=self.host, overall=4
+        )
+        stats = HostStats.objects.get(user=self.host)
+        self.assertEqual((stats.hosted_places_count, stats.review_count), (1, 1))
+
+        place.delete()
+        review.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.hosted_places_count, stats.review_count), (0, 0))
+
+    def test_delete_host_with_places_and_reviews(self):
+        self.create_place()
+        Review.objects.create(reviewer=self.guest, reviewee=self.host, overall=4)
+
+        # The cascade removes the stats row before the places and reviews
+        self.host.delete()
+        self.assertFalse(HostStats.objects.exists())
+        self.assertFalse(Place.objects.exists())
+
+    def test_delete_host_with_only_places(self):
+        self.create_place()
+        self.host.delete()
+        self.assertFalse(HostStats.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class HostReviewListTests(TestCase):
+    def setUp(self):
+        self.host = User.objects.create_user(email="host@example.com", full_name="Host")
+        for index, overall in enumerate([3, None, 5, None, 1]):
+            reviewer = User.objects.create_user(
+                email=f"guest{index}@example.com", full_name=f"Guest {index}"
+            )
+            Review.objects.create(
+                reviewer=reviewer, reviewee=self.host, overall=overall
+            )
+
+    def list_reviews(self, sort):
+        ratings = []
+        url = f"/api/v1/user/about-host/{self.host.pk}/reviews/?sort={sort}&page_size=2"
+        while url:
+            body = self.client.get(url).json()
+            ratings += [review["overall"] for review in body["results"]]
+            url = body["next"]
+        return ratings
+
+    def test_rating_sorts_include_unrated_reviews(self):
+        self.assertEqual(self.list_reviews("highest"), [5, 3, 1, None, None])
+        self.assertEqual(self.list_reviews("lowest"), [None, None, 1, 3, 5])
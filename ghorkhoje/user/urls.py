@@ -71,6 +71,11 @@ user_urlpatterns = [
     ),
     path("analytics/", UserAnalyticsAPIView.as_view(), name="user_analytics"),
     path("about-host/<int:pk>/", AboutHostAPIView.as_view(), name="about_host"),
+    path(
+        "about-host/<int:pk>/reviews/",
+        HostReviewListAPIView.as_view(),
+        name="about_host_reviews",
+    ),
     # Reviews
     path("review-user/<int:pk>/", ReviewUserAPIView.as_view(), name="review-user"),
     path(
@@ -1,6 +1,7 @@
 import traceback
 from datetime import date, timedelta
 from django.db.models import Avg, Prefetch
+from django.db.models.functions import Coalesce
 
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -8,6 +9,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.pagination import PageNumberPagination
 
 from utils.responses import common_response
+from utils.pagination import KeysetPaginationMixin
 from user.helpers import (
     user_registration_service,
     otp_verification_service,
@@ -23,17 +25,23 @@ from user.helpers import (
 )
 from user.models import *
 from user.serializers import *
-from place.serializer import PlaceListOwnerSerializer
-from place.models import Bookmark
+from place.configs import ReviewListing
+from place.bookmarks import bookmarked_place_ids
+from place.serializer import PlaceListOwnerSerializer, PlaceListSerializer
+from place.models import Bookmark, Image
 
 
-class Pagination(PageNumberPagination):
+class Pagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
     page_query_param = "page"
 
 
+class ReviewPagination(Pagination):
+    keyset_by_default = True
+
+
 class RegisterUserView(APIView):
     permission_classes = [AllowAny]
 
@@ -283,6 +291,14 @@ class UserNotificationAPIView(APIView):
             notifications = Notification.objects.filter(user=request.user).order_by(
                 "-created_at"
             )
+
+            # Infinite-scroll clients opt in to cursor pages with ?cursor=
+            if "cursor" in request.query_params:
+                pagination = Pagination()
+                notifications = pagination.paginate_queryset(notifications, request)
+                serializer = NotificationSerializer(notifications, many=True)
+                return pagination.get_paginated_response(serializer.data)
+
             serializer = NotificationSerializer(notifications, many=True)
             return common_response(
                 200, "Notifications fetched successfully.", serializer.data
@@ -358,24 +374,37 @@ class MarkAllNotificationsReadAPIView(APIView):
 
 class BookmarkListAPIView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = Pagination
 
     def get(self, request):
         try:
-            bookmark, _ = Bookmark.objects.get_or_create(user=request.user)
+            # Paged over the bookmark rows so the latest bookmarks come first
+            bookmarked = (
+                Bookmark.places.through.objects.filter(bookmark__user=request.user)
+                .select_related("place__owner")
+                .prefetch_related(
+                    Prefetch(
+                        "place__images",
+                        queryset=Image.objects.only("id", "place", "image", "variants")[
+                            :1
+                        ],
+                        to_attr="first_image",
+                    ),
+                )
+                .order_by("-id")
+            )
 
-            serializer = PlaceDetailsSerializer(
-                bookmark.places.all(),
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(bookmarked, request)
+            serializer = PlaceListSerializer(
+                [row.place for row in page],
                 many=True,
                 context={"request": request},
             )
-
-            return common_response(
-                200,
-                "Bookmarks fetched successfully.",
-                serializer.data,
-            )
+            return paginator.get_paginated_response(serializer.data)
 
         except Exception as e:
+            traceback.print_exc()
             return common_response(400, str(e))
 
 
@@ -396,9 +425,7 @@ class IdsBookmarkedPlacesAPIView(APIView):
 
     def get(self, request):
         try:
-            bookmark, _ = Bookmark.objects.get_or_create(user=request.user)
-
-            ids = list(bookmark.places.values_list("id", flat=True))
+            ids = sorted(bookmarked_place_ids(request.user.pk))
 
             return common_response(200, "Bookmarks fetched successfully.", ids)
 
@@ -419,7 +446,9 @@ class ListedPropertiesAPIView(APIView):
                 .prefetch_related(
                     Prefetch(
                         "images",
-                        queryset=Image.objects.only("id", "image")[:1],
+                        queryset=Image.objects.only("id", "place", "image", "variants")[
+                            :1
+                        ],
                         to_attr="first_image",
                     ),
                 )
@@ -441,7 +470,21 @@ class AboutHostAPIView(APIView):
 
     def get(self, request, pk):
         try:
-            user = User.objects.filter(id=pk).first()
+            user = (
+                User.objects.select_related("host_stats")
+                .prefetch_related(
+                    # Only the latest reviews are embedded, the rest are paginated
+                    Prefetch(
+                        "received_reviews",
+                        queryset=Review.objects.select_related("reviewer").order_by(
+                            "-created_at", "-id"
+                        )[: ReviewListing.LATEST_COUNT],
+                        to_attr="latest_received_reviews",
+                    )
+                )
+                .filter(id=pk)
+                .first()
+            )
             if not user:
                 return common_response(404, "User not found.")
 
@@ -453,6 +496,39 @@ class AboutHostAPIView(APIView):
             return common_response(400, str(e))
 
 
+class HostReviewListAPIView(APIView):
+    permission_classes = [AllowAny]
+    pagination_class = ReviewPagination
+
+    def get(self, request, pk):
+        try:
+            if not User.objects.filter(id=pk).exists():
+                return common_response(404, "User not found.")
+
+            sort = request.query_params.get("sort", ReviewListing.DEFAULT_SORT)
+            if sort not in ReviewListing.SORT_OPTIONS:
+                return common_response(
+                    400,
+                    f"'sort' must be one of: {', '.join(ReviewListing.SORT_OPTIONS)}.",
+                )
+
+            reviews = Review.objects.select_related("reviewer").filter(reviewee_id=pk)
+            ordering = ReviewListing.SORT_OPTIONS[sort]
+            if sort in ("highest", "lowest"):
+                # Cursors cannot point at a NULL rating, unrated reviews sort as 0
+                reviews = reviews.annotate(rating=Coalesce("overall", 0))
+                ordering = ordering.replace("overall", "rating")
+            reviews = reviews.order_by(ordering)
+
+            paginator = self.pagination_class()
+            page = paginator.paginate_queryset(reviews, request)
+            serializer = ReviewSerializer(page, many=True, context={"request": request})
+            return paginator.get_paginated_response(serializer.data)
+        except Exception as e:
+            traceback.print_exc()
+            return common_response(400, str(e))
+
+
 # # Task APIs
 # class TaskCreationAPIView(APIView):
 #     permission_classes = [IsAuthenticated]
@@ -0,0 +1,160 @@
+import hashlib
+import time
+import traceback
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+from rest_framework.response import Response
+
+GENERATION_PREFIX = "cache_generation"
+RESPONSE_PREFIX = "response_cache"
+STATS_PREFIX = "response_cache_stats"
+RESPONSE_CACHE_TTL = 300  # seconds, also bounds staleness of untracked data
+
+# Namespaces of decorated views, for reporting stats
+_namespaces = set()
+
+
+def _generation_key(name):
+    return f"{GENERATION_PREFIX}:{name}"
+
+
+def get_generations(*names):
+    """
+    Return the current generation of each name. Missing counters start from
+    the current time so a counter lost to eviction never repeats old values.
+    """
+    keys = [_generation_key(name) for name in names]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(*names):
+    """
+    Invalidate every cache entry keyed on the given generations once the
+    current transaction commits, so readers never cache uncommitted data.
+    """
+
+    def bump():
+        for name in names:
+            key = _generation_key(name)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+            except Exception:
+                traceback.print_exc()
+
+    transaction.on_commit(bump)
+
+
+def _record(namespace, outcome):
+    key = f"{STATS_PREFIX}:{namespace}:{outcome}"
+    try:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    except Exception:
+        traceback.print_exc()
+
+
+def response_cache_stats():
+    keys = {
+        namespace: (
+            f"{STATS_PREFIX}:{namespace}:hits",
+            f"{STATS_PREFIX}:{namespace}:misses",
+        )
+        for namespace in sorted(_namespaces)
+    }
+    counters = cache.get_many([key for pair in keys.values() for key in pair])
+
+    stats = {}
+    for namespace, (hits_key, misses_key) in keys.items():
+        hits = counters.get(hits_key, 0)
+        misses = counters.get(misses_key, 0)
+        total = hits + misses
+        stats[namespace] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def response_cache_key(namespace, request, generations, kwargs=None):
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+        if value != ""
+    )
+    # Serializers build absolute URLs, so the host is part of the key
+    raw = urlencode(
+        [
+            ("host", request.build_absolute_uri("/")),
+            ("format", request.accepted_renderer.format),
+        ]
+        + sorted((kwargs or {}).items())
+        + params
+    )
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    version = ".".join(str(generation) for generation in get_generations(*generations))
+    return f"{RESPONSE_PREFIX}:{namespace}:{version}:{digest}"
+
+
+def _freeze(response):
+    if isinstance(response, Response):
+        return ("data", response.status_code, response.data)
+    return ("content", response.status_code, response.content, response["Content-Type"])
+
+
+def _thaw(cached):
+    if cached[0] == "data":
+        return Response(cached[2], status=cached[1])
+    return HttpResponse(cached[2], status=cached[1], content_type=cached[3])
+
+
+def cache_anonymous_response(namespace, generations, timeout=RESPONSE_CACHE_TTL):
+    """
+    Cache successful responses of a view method for anonymous users, keyed on
+    the query params and the given generation counters. A cache outage falls
+    back to running the view.
+    """
+    _namespaces.add(namespace)
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.user.is_authenticated:
+                return view_method(self, request, *args, **kwargs)
+
+            try:
+                key = response_cache_key(namespace, request, generations, kwargs)
+                cached = cache.get(key)
+            except Exception:
+                traceback.print_exc()
+                return view_method(self, request, *args, **kwargs)
+
+            if cached is not None:
+                _record(namespace, "hits")
+                return _thaw(cached)
+
+            _record(namespace, "misses")
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                try:
+                    cache.set(key, _freeze(response), timeout)
+                except Exception:
+                    traceback.print_exc()
+            return response
+
+        return wrapper
+
+    return decorator
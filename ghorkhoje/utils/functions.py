@@ -1,10 +1,12 @@
 from django.core.exceptions import ValidationError
 from django.utils.timezone import now
 import os
+import re
 import uuid
 
 import os
 from django.core.validators import FileExtensionValidator
+from django.db.models import Q
 from django.conf import settings
 
 
@@ -57,3 +59,68 @@ def unique_image_path(instance, filename):
     unique_filename = f"{uuid.uuid4().hex}_{int(now().timestamp())}.{ext}"
 
     return os.path.join("places", unique_filename)
+
+
+def _slug_suffix_pattern(base_slugs):
+    # Matches each base slug itself and its "-N" variants
+    bases = "|".join(re.escape(base) for base in base_slugs)
+    return rf"^({bases})(-[0-9]+)?$"
+
+
+def _next_slug_counters(model, base_slugs, field):
+    """
+    Return the next free suffix for every base slug, from one query per
+    chunk of bases. 0 means the base slug itself is free.
+    """
+    counters = {base: 0 for base in base_slugs}
+    bases = list(counters)
+    for start in range(0, len(bases), 500):
+        chunk = bases[start : start + 500]
+        # The prefix match lets PostgreSQL use the slug's pattern_ops index
+        prefixes = Q()
+        for base in chunk:
+            prefixes |= Q(**{f"{field}__startswith": base})
+        existing = (
+            model.objects.filter(prefixes)
+            .filter(**{f"{field}__regex": _slug_suffix_pattern(chunk)})
+            .values_list(field, flat=True)
+        )
+        for slug in existing:
+            base, _, suffix = slug.rpartition("-")
+            if slug in counters:
+                counters[slug] = max(counters[slug], 1)
+            if base in counters and suffix.isdigit():
+                counters[base] = max(counters[base], int(suffix) + 1)
+    return counters
+
+
+def next_available_slug(model, base_slug, field="slug"):
+    """
+    Return `base_slug` or the first unused `base_slug-N` after the highest
+    existing suffix, using a single query. Concurrent writers may still
+    pick the same slug, so callers retry on IntegrityError.
+    """
+    counter = _next_slug_counters(model, [base_slug], field)[base_slug]
+    return f"{base_slug}-{counter}" if counter else base_slug
+
+
+def allocate_unique_slugs(model, base_slugs, field="slug"):
+    """
+    Allocate one unique slug per item of `base_slugs` (duplicates allowed)
+    for bulk inserts, without a query per row.
+    """
+    counters = _next_slug_counters(model, set(base_slugs), field)
+    slugs = []
+    # A base ending in "-N" can produce the same slug as another base,
+    # e.g. "flat" x3 and "flat-2"
+    taken = set()
+    for base in base_slugs:
+        counter = counters[base]
+        slug = f"{base}-{counter}" if counter else base
+        while slug in taken:
+            counter += 1
+            slug = f"{base}-{counter}"
+        taken.add(slug)
+        slugs.append(slug)
+        counters[base] = counter + 1
+    return slugs
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+
+from rest_framework import serializers
+
+ABSOLUTE_PREFIXES = ("http://", "https://", "//")
+
+
+def _origin(request):
+    # Memoized on the request: one build_absolute_uri per response, not per field
+    origin = getattr(request, "_media_origin", None)
+    if origin is None:
+        origin = request.build_absolute_uri("/")[:-1]
+        request._media_origin = origin
+    return origin
+
+
+def absolute_url(url, request=None):
+    """Prefix a site relative URL with the request's origin."""
+    if not url or request is None or not url.startswith("/"):
+        return url
+    return _origin(request) + url
+
+
+def media_prefix(request=None):
+    """
+    Base URL of stored media: MEDIA_CDN_URL when configured, else MEDIA_URL
+    made absolute for `request`. Without a request it may stay relative.
+    """
+    base = settings.MEDIA_CDN_URL or settings.MEDIA_URL
+    if base.startswith(ABSOLUTE_PREFIXES):
+        return base
+    return absolute_url(base, request)
+
+
+def media_url(file, request=None):
+    """
+    URL of a stored media file (a FieldFile or its name), built from the
+    name without calling the storage backend. None for an empty file.
+    """
+    name = getattr(file, "name", file)
+    if not name:
+        return None
+    # Values saved as full URLs, e.g. images migrated from another host
+    if name.startswith(ABSOLUTE_PREFIXES):
+        return name
+    return media_prefix(request) + filepath_to_uri(name)
+
+
+class MediaFileField(serializers.FileField):
+    def to_representation(self, value):
+        return media_url(value, self.context.get("request"))
+
+
+class MediaImageField(serializers.ImageField):
+    def to_representation(self, value):
+        return media_url(value, self.context.get("request"))
+
+
+class MediaModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer whose file and image fields render through media_url."""
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: MediaFileField,
+        models.ImageField: MediaImageField,
+    }
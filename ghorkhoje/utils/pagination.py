@@ -0,0 +1,131 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset (cursor) mode for page number paginators.
+
+    Sending `?cursor=` (empty for the first page) switches to keyset pagination
+    over the queryset's own ordering: all of its order fields plus `id` as a
+    tie-breaker. Every page is then a single indexed range scan instead of an
+    OFFSET, and the total count is only computed when `?with_count=true`.
+    Paginators with `keyset_by_default` always use keyset mode.
+
+    Order fields must be columns or annotations whose values survive a JSON
+    round trip exactly; float annotations need to be double precision.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    keyset_by_default = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = (
+            self.keyset_by_default or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request) or 10
+        self.ordering = self.get_keyset_ordering(queryset)
+        queryset = queryset.order_by(
+            *(
+                f"-{field}" if descending else field
+                for field, descending in self.ordering
+            )
+        )
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            self.count = queryset.count()
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after_cursor(self.decode_cursor(cursor)))
+
+        results = list(queryset[: page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page_results = results[:page_size]
+        return self.page_results
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+
+        payload = {}
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["next"] = self.get_next_cursor_link()
+        payload["previous"] = None
+        payload["results"] = data
+        return Response(payload)
+
+    def get_keyset_ordering(self, queryset):
+        """
+        [(field, descending), ...] of the queryset's ordering, ending with
+        `id` (in the direction of the first field) when it is not in it.
+        """
+        ordering = []
+        for term in queryset.query.order_by:
+            field = term.lstrip("-") if isinstance(term, str) else None
+            if not field or "__" in field or field == "?":
+                raise ValueError(
+                    "Cursor pagination is not supported for this ordering."
+                )
+            field = "id" if field == "pk" else field
+            ordering.append((field, term.startswith("-")))
+
+        if not ordering:
+            return [("id", True)]
+        if "id" not in [field for field, _ in ordering]:
+            ordering.append(("id", ordering[0][1]))
+        return ordering
+
+    def after_cursor(self, values):
+        """Rows after `values` in the ordering: equal on a prefix, then past it."""
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = "lt" if descending else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        last = self.page_results[-1]
+        cursor = self.encode_cursor(
+            [getattr(last, field) for field, _ in self.ordering]
+        )
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def encode_cursor(self, values):
+        position = []
+        for value in values:
+            if isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = str(value)
+            position.append(value)
+        position = json.dumps(position, separators=(",", ":"))
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor.")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError("Invalid cursor.")
+        return values